@@ -5,29 +5,46 @@ Handles both HTTP and WebSocket connections
 
 import os
 import django
+from importlib import import_module
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'churchconnect.settings')
 django.setup()
 
-from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 from django.core.asgi import get_asgi_application
 
-# Import routing after Django setup
-from ChurchConnect.routing import websocket_urlpatterns
+from common.middleware import CachedAuthMiddlewareStack
 
 # Initialize Django ASGI application early to populate apps
 django_asgi_app = get_asgi_application()
 
+
+class _LazyRouter:
+    """
+    Build the WebSocket router on the first connection
+    HTTP-only processes never import the consumers and their model graph
+    """
+    
+    def __init__(self, dotted):
+        self._dotted = dotted
+        self._inner = None
+    
+    async def __call__(self, scope, receive, send):
+        if self._inner is None:
+            patterns = import_module(self._dotted).websocket_urlpatterns
+            self._inner = AllowedHostsOriginValidator(
+                CachedAuthMiddlewareStack(
+                    URLRouter(patterns)
+                )
+            )
+        return await self._inner(scope, receive, send)
+
+
 application = ProtocolTypeRouter({
     # HTTP requests
     "http": django_asgi_app,
     
     # WebSocket requests
-    "websocket": AllowedHostsOriginValidator(
-        AuthMiddlewareStack(
-            URLRouter(websocket_urlpatterns)
-        )
-    ),
+    "websocket": _LazyRouter('ChurchConnect.routing'),
 })
\ No newline at end of file
@@ -4,8 +4,13 @@ Handles background tasks and periodic jobs
 """
 
 import os
+import logging
+from datetime import timedelta
 from celery import Celery
-from celery.schedules import crontab
+from celery.schedules import crontab, schedule
+from kombu import Exchange, Queue
+
+logger = logging.getLogger(__name__)
 
 # Set default Django settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'churchconnect.settings')
@@ -22,7 +27,7 @@ app.autodiscover_tasks()
 app.conf.beat_schedule = {
     # Send event reminders every hour
     'send-event-reminders': {
-        'task': 'apps.events.tasks.send_event_reminders',
+        'task': 'send_event_reminders',
         'schedule': crontab(minute=0),  # Every hour
     },
     
@@ -34,24 +39,64 @@ app.conf.beat_schedule = {
     
     # Generate daily reports
     'generate-daily-reports': {
-        'task': 'common.tasks.generate_daily_reports',
+        'task': 'generate_daily_reports',
         'schedule': crontab(hour=6, minute=0),  # 6 AM daily
     },
     
     # Send birthday wishes
     'send-birthday-wishes': {
-        'task': 'apps.members.tasks.send_birthday_wishes',
+        'task': 'send_birthday_wishes',
         'schedule': crontab(hour=8, minute=0),  # 8 AM daily
     },
     
+    # Purge used/expired auth tokens
+    'cleanup-expired-tokens': {
+        'task': 'cleanup_expired_tokens',
+        'schedule': crontab(hour=3, minute=0),  # 3 AM daily
+    },
+    
     # Sync payment status
     'sync-payment-status': {
         'task': 'apps.donations.tasks.sync_payment_status',
-        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+        'schedule': schedule(run_every=timedelta(minutes=15)),  # Every 15 minutes
     },
 }
 
+# Task Queues
+# Bursty reminder/cleanup jobs use lazy (disk-backed) queues; debug messages are not persisted
+app.conf.task_default_queue = 'default'
+app.conf.task_queues = [
+    Queue('default'),
+    Queue('email'),
+    Queue('reminders', queue_arguments={'x-queue-mode': 'lazy'}),
+    Queue('cleanup', queue_arguments={'x-queue-mode': 'lazy'}),
+    Queue(
+        'transient',
+        Exchange('transient', delivery_mode=1),
+        routing_key='transient',
+        durable=False,
+    ),
+]
+app.conf.task_routes = {
+    'send_event_reminders': {'queue': 'reminders'},
+    'send_birthday_wishes': {'queue': 'reminders'},
+    # Long report job: keep it on the prefetch=1 pool, not behind short tasks
+    'generate_daily_reports': {'queue': 'reminders'},
+    'cleanup_expired_tokens': {'queue': 'cleanup'},
+    'send_transactional_email': {'queue': 'email'},
+    'create_and_send_verification': {'queue': 'email'},
+    'create_and_send_password_reset': {'queue': 'email'},
+    'send_bulk_emails': {'queue': 'email'},
+    'send_email_task': {'queue': 'email'},
+    'send_bulk_email_task': {'queue': 'email'},
+    'send_email_batch_task': {'queue': 'email'},
+    'ChurchConnect.celery.debug_task': {'queue': 'transient', 'delivery_mode': 'transient'},
+}
+
 # Celery Configuration
+# Prefetch is set per worker pool (see docker-compose.yml): long reminder/cleanup
+# tasks run with --prefetch-multiplier=1, short tasks with a high multiplier.
+# SMTP-bound email tasks get their own gevent worker so reports never delay them
 app.conf.update(
     task_serializer='json',
     accept_content=['json'],
@@ -61,11 +106,11 @@ app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
-    worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    broker_pool_limit=10,  # Match gunicorn workers x threads publishing via .delay()
 )
 
 @app.task(bind=True)
 def debug_task(self):
     """Debug task for testing"""
-    print(f'Request: {self.request!r}')
\ No newline at end of file
+    logger.debug('Request: %r', self.request)
\ No newline at end of file
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # connected apps
     'authentication',
@@ -65,6 +66,7 @@ INSTALLED_APPS = [
     'django_celery_beat',
     'django_celery_results',
     'drf_yasg',
+    'easy_thumbnails',
 ]
 
 
@@ -85,14 +87,20 @@ ROOT_URLCONF = 'ChurchConnect.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
-        'APP_DIRS': True,
+        'DIRS': [BASE_DIR / 'templates'],
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compile each template once per process
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -129,6 +137,19 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# Calibrate PBKDF2_ITERATIONS so one hash takes ~250ms on the production CPU;
+# it dominates the cost of login, registration and password changes
+PBKDF2_ITERATIONS = config('PBKDF2_ITERATIONS', default=600000, cast=int)
+
+PASSWORD_HASHERS = [
+    'authentication.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -160,7 +181,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -173,8 +194,11 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'drf_orjson_renderer.renderers.ORJSONRenderer',
     ),
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '5/min',
+    },
     # 'EXCEPTION_HANDLER': 'apps.common.exceptions.custom_exception_handler',  # We'll create this
 }
 
@@ -197,6 +221,19 @@ SIMPLE_JWT = {
 # Custom User Model
 AUTH_USER_MODEL = 'authentication.User'
 
+# EmailBackend also serves the admin login, so ModelBackend is not listed:
+# it would repeat the lookup and the password hash on every failed login
+AUTHENTICATION_BACKENDS = [
+    'authentication.backends.EmailBackend',
+]
+
+# Thumbnails (easy-thumbnails)
+THUMBNAIL_ALIASES = {
+    '': {
+        'avatar': {'size': (70, 70), 'crop': True},
+    },
+}
+
 
 JAZZMIN_SETTINGS = {
     "site_title": "Gasland",
@@ -255,8 +292,12 @@ JAZZMIN_SETTINGS = {
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        # redis-py parses replies with hiredis when it is installed and
+        # channels_redis keeps a connection pool per event loop
         'CONFIG': {
             "hosts": [(config('REDIS_HOST', default='127.0.0.1'), config('REDIS_PORT', default=6379, cast=int))],
+            "capacity": 1500,  # per-channel backlog before sends raise ChannelFull
+            "expiry": 10,  # drop real-time messages nobody read within 10s
         },
     },
 }
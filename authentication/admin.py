@@ -4,6 +4,10 @@ Django Admin Configuration for User and Profile Management
 
 from django.contrib import admin
 from django.utils.html import format_html
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import get_thumbnailer
+from common.utils import is_changelist
+from denomination.models import Denomination, ChurchBranch
 from .models import User, UserProfile
 
 
@@ -19,6 +23,7 @@ class UserAdmin(admin.ModelAdmin):
     search_fields = ['email', 'first_name', 'last_name', 'username', 'phone_number']
     readonly_fields = ['created_at', 'updated_at', 'last_login']
     ordering = ['-created_at']
+    list_select_related = ('denomination', 'church_branch')
 
     fieldsets = (
         ('Personal Information', {
@@ -43,15 +48,60 @@ class UserAdmin(admin.ModelAdmin):
 
     def profile_preview(self, obj):
         """Display small profile image preview"""
-        if obj.profile_image:
-            return format_html('<img src="{}" width="35" height="35" style="border-radius:50%;" />', obj.profile_image.url)
-        return '-'
+        if not obj.profile_image:
+            return '-'
+        try:
+            # The thumbnail is generated on upload; only build its URL here,
+            # with no thumbnail queries or image work per row
+            thumbnailer = get_thumbnailer(obj.profile_image)
+            name = thumbnailer.get_thumbnail_name(aliases.get('avatar'))
+            url = thumbnailer.thumbnail_storage.url(name)
+            original = obj.profile_image.url
+        except Exception:
+            # Storage backends raise their own errors; never break the changelist
+            return '-'
+        # Images uploaded before thumbnails were generated fall back to the original
+        return format_html(
+            '<img src="{}" onerror="this.onerror=null;this.src=\'{}\'" width="35" height="35" '
+            'style="border-radius:50%;" />',
+            url, original
+        )
     profile_preview.short_description = 'Profile'
 
     def date_joined_display(self, obj):
         """Display created date in readable format"""
         return obj.created_at.strftime("%b %d, %Y")
     date_joined_display.short_description = 'Joined'
+    date_joined_display.admin_order_field = 'created_at'
+
+    def get_queryset(self, request):
+        """Optimize query"""
+        qs = super().get_queryset(request).select_related('denomination', 'church_branch')
+        if is_changelist(request):
+            # Only load the columns rendered in the changelist rows
+            qs = qs.only(
+                'id', 'email', 'first_name', 'last_name', 'username', 'role',
+                'is_verified', 'is_active', 'created_at', 'profile_image',
+                'denomination__id', 'church_branch__id'
+            )
+        return qs
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """Load only what the dropdown labels need"""
+        if db_field.name == 'denomination':
+            kwargs['queryset'] = Denomination.objects.only('id', 'name')
+        elif db_field.name == 'church_branch':
+            kwargs['queryset'] = ChurchBranch.objects.select_related('denomination').only(
+                'id', 'name', 'denomination__name'
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        """Permission labels include the content type"""
+        if db_field.name == 'user_permissions':
+            qs = kwargs.get('queryset', db_field.remote_field.model.objects)
+            kwargs['queryset'] = qs.select_related('content_type')
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
 
 
 @admin.register(UserProfile)
@@ -69,6 +119,7 @@ class UserProfileAdmin(admin.ModelAdmin):
     ]
     readonly_fields = ['age', 'created_at', 'updated_at']
     ordering = ['-created_at']
+    list_select_related = ('user',)
 
     fieldsets = (
         ('Personal Information', {
@@ -97,6 +148,27 @@ class UserProfileAdmin(admin.ModelAdmin):
         """Readable created date"""
         return obj.created_at.strftime("%b %d, %Y")
     created_at_display.short_description = 'Created'
+    created_at_display.admin_order_field = 'created_at'
+
+    def get_queryset(self, request):
+        """Optimize query"""
+        qs = super().get_queryset(request).select_related('user').with_age()
+        if is_changelist(request):
+            # Only load the columns rendered in the changelist rows
+            qs = qs.only(
+                'id', 'gender', 'city', 'state', 'department', 'country',
+                'date_of_birth', 'created_at', 'user__first_name',
+                'user__last_name', 'user__email', 'user__username'
+            )
+        return qs
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """Load only what the user dropdown labels need"""
+        if db_field.name == 'user':
+            kwargs['queryset'] = User.objects.only(
+                'id', 'first_name', 'last_name', 'email', 'username'
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 
@@ -0,0 +1,36 @@
+"""
+JWT Authentication with a short-lived user cache
+"""
+
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import invalidate_cached_user, profile_data_cache_key, user_cache_key
+
+# Seconds an authenticated user is served from the cache
+USER_CACHE_TIMEOUT = 60
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that caches the token's user by id
+    Saves the user SELECT on every authenticated request; saving a User or
+    UserProfile calls invalidate_cached_user(), as do the views that change
+    the user through QuerySet.update()
+    """
+    
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            # Runs the not-found, inactive and revocation checks
+            user = super().get_user(validated_token)
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user
\ No newline at end of file
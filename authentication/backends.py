@@ -0,0 +1,39 @@
+"""
+Authentication Backends
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticate with email and password in a single user lookup
+    Replaces ModelBackend: the admin login form passes the email as username
+    The lookup is case-insensitive so rows saved before emails were lowercased
+    still match; the UPPER(email) index serves it
+    """
+    
+    def authenticate(self, request, email=None, password=None, username=None, **kwargs):
+        User = get_user_model()
+        email = email or username or kwargs.get(User.USERNAME_FIELD)
+        if email is None or password is None:
+            return None
+        
+        manager = User._default_manager
+        try:
+            user = manager.get(email__iexact=email)
+        except User.MultipleObjectsReturned:
+            # Older rows that differ only by case; the lowercased one wins
+            user = manager.filter(email=email.lower()).first()
+        except User.DoesNotExist:
+            user = None
+        
+        if user is None:
+            # Run the hasher anyway so unknown emails take as long as wrong passwords
+            User().set_password(password)
+            return None
+        
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
\ No newline at end of file
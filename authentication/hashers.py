@@ -0,0 +1,17 @@
+"""
+Password Hashers
+PBKDF2 with a work factor pinned per deployment
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 using PBKDF2_ITERATIONS from settings
+    Keeps the pbkdf2_sha256 algorithm name, so existing hashes still verify
+    and are re-hashed at the new cost on the user's next login
+    """
+    
+    iterations = settings.PBKDF2_ITERATIONS
\ No newline at end of file
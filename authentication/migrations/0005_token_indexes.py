@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-16 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0004_user_userprofile_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="emailverificationtoken",
+            index=models.Index(
+                fields=["used", "expires_at"], name="email_verif_used_0599a8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="emailverificationtoken",
+            index=models.Index(
+                fields=["user", "used"], name="email_verif_user_id_867e40_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="passwordresettoken",
+            index=models.Index(
+                fields=["used", "expires_at"], name="password_re_used_22e924_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="passwordresettoken",
+            index=models.Index(
+                fields=["user", "used"], name="password_re_user_id_4cd856_idx"
+            ),
+        ),
+    ]
@@ -174,10 +174,24 @@ Custom user model with role-based access control
 """
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Case, ExpressionWrapper, IntegerField, Q, Value, When
+from django.db.models.functions import ExtractYear, Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from datetime import date
+from easy_thumbnails.signal_handlers import generate_aliases_global
+from easy_thumbnails.signals import saved_file
+import logging
 import secrets
 
+logger = logging.getLogger(__name__)
+
 
 class User(AbstractUser):
     """
@@ -191,6 +205,13 @@ class User(AbstractUser):
         CHURCH_ADMIN = 'church_admin', _('Church Admin')
         MEMBER = 'member', _('Member')
     
+    # Roles with admin privileges (frozenset for constant-time membership checks)
+    ADMIN_ROLES = frozenset({
+        Role.SUPER_ADMIN,
+        Role.DENOMINATION_ADMIN,
+        Role.CHURCH_ADMIN,
+    })
+    
     # Extended fields
     email = models.EmailField(_('email address'), unique=True)
     phone_number = models.CharField(_('phone number'), max_length=20, blank=True, null=True)
@@ -244,9 +265,30 @@ class User(AbstractUser):
         verbose_name = _('user')
         verbose_name_plural = _('users')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['role']),
+            models.Index(fields=['is_active', 'is_verified']),
+            models.Index(fields=['created_at']),
+            # Case-insensitive login lookup (email__iexact compiles to UPPER)
+            models.Index(Upper('email'), name='user_email_upper_idx'),
+            # Trigram index for the admin's email icontains search (needs pg_trgm)
+            GinIndex(
+                OpClass(Upper('email'), name='gin_trgm_ops'),
+                name='user_email_trgm',
+            ),
+        ]
     
     def __str__(self):
-        return f"{self.get_full_name()} ({self.email})"
+        name = f"{self.first_name} {self.last_name}".strip() or self.username
+        return f"{name} ({self.email})"
+    
+    def save(self, *args, **kwargs):
+        """Store email and username lowercased so lookups can match exactly"""
+        if self.email:
+            self.email = self.email.lower()
+        if self.username:
+            self.username = self.username.lower()
+        super().save(*args, **kwargs)
     
     def get_full_name(self):
         """Return user's full name"""
@@ -266,11 +308,26 @@ class User(AbstractUser):
     
     def is_admin(self):
         """Check if user has any admin role"""
-        return self.role in [
-            self.Role.SUPER_ADMIN,
-            self.Role.DENOMINATION_ADMIN,
-            self.Role.CHURCH_ADMIN
-        ]
+        return self.role in self.ADMIN_ROLES
+
+
+class UserProfileQuerySet(models.QuerySet):
+    """QuerySet helpers for user profiles"""
+    
+    def with_age(self):
+        """Annotate age computed by the database (matches UserProfile.age)"""
+        today = date.today()
+        birthday_pending = (
+            Q(date_of_birth__month__gt=today.month) |
+            Q(date_of_birth__month=today.month, date_of_birth__day__gt=today.day)
+        )
+        return self.annotate(age=ExpressionWrapper(
+            Value(today.year) - ExtractYear('date_of_birth') - Case(
+                When(birthday_pending, then=Value(1)),
+                default=Value(0),
+            ),
+            output_field=IntegerField()
+        ))
 
 
 class UserProfile(models.Model):
@@ -319,19 +376,25 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
     
+    objects = UserProfileQuerySet.as_manager()
+    
     class Meta:
         db_table = 'user_profiles'
         verbose_name = _('user profile')
         verbose_name_plural = _('user profiles')
+        indexes = [
+            models.Index(fields=['state']),
+            models.Index(fields=['department']),
+            models.Index(fields=['city']),
+        ]
     
     def __str__(self):
         return f"Profile of {self.user.get_full_name()}"
     
-    @property
+    @cached_property
     def age(self):
-        """Calculate user's age"""
+        """Calculate user's age (overridden by the with_age() annotation)"""
         if self.date_of_birth:
-            from datetime import date
             today = date.today()
             return today.year - self.date_of_birth.year - (
                 (today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day)
@@ -339,7 +402,58 @@ class UserProfile(models.Model):
         return None
 
 
-class EmailVerificationToken(models.Model):
+def user_cache_key(user_id):
+    """Cache key for an authenticated user"""
+    return f"user:{user_id}"
+
+
+def profile_data_cache_key(user_id):
+    """Cache key for a user's serialized profile response"""
+    return f"userdata:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    """Drop the cached user and profile response after their data changes"""
+    cache.delete_many([user_cache_key(user_id), profile_data_cache_key(user_id)])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserProfile)
+def invalidate_user_on_save(sender, instance, **kwargs):
+    """Any save of a user or profile (admin, other apps) drops the cached copies"""
+    user_id = instance.pk if sender is User else instance.user_id
+    # After commit, so a concurrent read cannot re-cache the old row
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+@receiver(saved_file, sender=User)
+def generate_profile_thumbnails(sender, fieldfile, **kwargs):
+    """Build the thumbnail aliases once, when a new profile image is uploaded"""
+    try:
+        generate_aliases_global(fieldfile)
+    except Exception:
+        # A bad image must not fail the upload; the admin falls back to the original
+        logger.exception(f"Failed to generate thumbnails for {fieldfile.name}")
+
+
+class SingleUseTokenMixin:
+    """Shared redemption for the one-time token models"""
+    
+    @classmethod
+    def consume(cls, token):
+        """
+        Mark the token used if it is still valid, in a single UPDATE
+        Returns the token with its user, or None if it was invalid, expired or used
+        """
+        consumed = cls.objects.filter(
+            token=token, used=False, expires_at__gt=timezone.now()
+        ).update(used=True)
+        if not consumed:
+            return None
+        return cls.objects.select_related('user').get(token=token)
+
+
+class EmailVerificationToken(SingleUseTokenMixin, models.Model):
     """
     Email verification tokens
     """
@@ -356,6 +470,10 @@ class EmailVerificationToken(models.Model):
     class Meta:
         db_table = 'email_verification_tokens'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['used', 'expires_at']),
+            models.Index(fields=['user', 'used']),
+        ]
     
     def __str__(self):
         return f"Token for {self.user.email}"
@@ -372,11 +490,11 @@ class EmailVerificationToken(models.Model):
     
     def mark_as_used(self):
         """Mark token as used"""
+        type(self).objects.filter(pk=self.pk).update(used=True)
         self.used = True
-        self.save()
 
 
-class PasswordResetToken(models.Model):
+class PasswordResetToken(SingleUseTokenMixin, models.Model):
     """
     Password reset tokens
     """
@@ -393,6 +511,10 @@ class PasswordResetToken(models.Model):
     class Meta:
         db_table = 'password_reset_tokens'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['used', 'expires_at']),
+            models.Index(fields=['user', 'used']),
+        ]
     
     def __str__(self):
         return f"Reset token for {self.user.email}"
@@ -409,5 +531,5 @@ class PasswordResetToken(models.Model):
     
     def mark_as_used(self):
         """Mark token as used"""
-        self.used = True
-        self.save()
\ No newline at end of file
+        type(self).objects.filter(pk=self.pk).update(used=True)
+        self.used = True
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""
+Pagination classes for user endpoints
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class UserCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key
+    Each page is an indexed range scan instead of LIMIT/OFFSET
+    """
+    ordering = '-id'
+    page_size = 50
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        # An already-materialized list (e.g. just the requesting user) is a single page
+        if isinstance(queryset, list):
+            self.has_next = self.has_previous = False
+            return queryset
+        return super().paginate_queryset(queryset, request, view)
\ No newline at end of file
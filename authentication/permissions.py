@@ -4,61 +4,50 @@ Custom Permission Classes for Role-Based Access Control
 
 from rest_framework import permissions
 
+from .models import User
 
-class IsSuperAdmin(permissions.BasePermission):
+
+class _RoleRequired(permissions.BasePermission):
     """
-    Permission check for Super Admin role
+    Base permission: authenticated user whose role is in `allowed`
     """
-    message = "You must be a Super Admin to perform this action."
+    allowed = frozenset()
     
     def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            request.user.is_super_admin()
-        )
+        user = request.user
+        return user.is_authenticated and user.role in self.allowed
+
+
+class IsSuperAdmin(_RoleRequired):
+    """
+    Permission check for Super Admin role
+    """
+    message = "You must be a Super Admin to perform this action."
+    allowed = frozenset({User.Role.SUPER_ADMIN})
 
 
-class IsDenominationAdmin(permissions.BasePermission):
+class IsDenominationAdmin(_RoleRequired):
     """
     Permission check for Denomination Admin role
     """
     message = "You must be a Denomination Admin to perform this action."
-    
-    def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            request.user.is_denomination_admin()
-        )
+    allowed = frozenset({User.Role.DENOMINATION_ADMIN})
 
 
-class IsChurchAdmin(permissions.BasePermission):
+class IsChurchAdmin(_RoleRequired):
     """
     Permission check for Church Admin role
     """
     message = "You must be a Church Admin to perform this action."
-    
-    def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            request.user.is_church_admin()
-        )
+    allowed = frozenset({User.Role.CHURCH_ADMIN})
 
 
-class IsAnyAdmin(permissions.BasePermission):
+class IsAnyAdmin(_RoleRequired):
     """
     Permission check for any admin role
     """
     message = "You must be an Admin to perform this action."
-    
-    def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            request.user.is_admin()
-        )
+    allowed = User.ADMIN_ROLES
 
 
 class IsOwnerOrAdmin(permissions.BasePermission):
@@ -87,11 +76,8 @@ class IsVerified(permissions.BasePermission):
     message = "Your account must be verified to perform this action."
     
     def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            request.user.is_verified
-        )
+        user = request.user
+        return user.is_authenticated and user.is_verified
 
 
 class IsSameDenomination(permissions.BasePermission):
@@ -116,6 +102,47 @@ class IsSameDenomination(permissions.BasePermission):
         return False
 
 
+# Sentinel to tell a missing attribute apart from a null relation
+_MISSING = object()
+
+
+def _allow(user, obj):
+    return True
+
+
+def _deny(user, obj):
+    return False
+
+
+def _same_denomination(user, obj):
+    """Denomination admin can access all branches in their denomination"""
+    denomination = getattr(obj, 'denomination', _MISSING)
+    if denomination is not _MISSING:
+        return denomination == user.denomination
+    church_branch = getattr(obj, 'church_branch', None)
+    if church_branch:
+        return church_branch.denomination == user.denomination
+    return False
+
+
+def _same_branch(user, obj):
+    """Church admin can only access their branch"""
+    church_branch = getattr(obj, 'church_branch', _MISSING)
+    if church_branch is not _MISSING:
+        return church_branch == user.church_branch
+    # If object is the church branch itself
+    if obj.__class__.__name__ == 'ChurchBranch':
+        return obj == user.church_branch
+    return False
+
+
+_BRANCH_RESOLVERS = {
+    User.Role.SUPER_ADMIN: _allow,
+    User.Role.DENOMINATION_ADMIN: _same_denomination,
+    User.Role.CHURCH_ADMIN: _same_branch,
+}
+
+
 class IsSameChurchBranch(permissions.BasePermission):
     """
     Permission check: User must be in the same church branch as the object
@@ -123,23 +150,5 @@ class IsSameChurchBranch(permissions.BasePermission):
     message = "You can only access resources within your church branch."
     
     def has_object_permission(self, request, view, obj):
-        # Super admin and denomination admin have broader access
-        if request.user.is_super_admin():
-            return True
-        
-        if request.user.is_denomination_admin():
-            # Denomination admin can access all branches in their denomination
-            if hasattr(obj, 'denomination'):
-                return obj.denomination == request.user.denomination
-            if hasattr(obj, 'church_branch') and obj.church_branch:
-                return obj.church_branch.denomination == request.user.denomination
-        
-        # Church admin can only access their branch
-        if request.user.is_church_admin():
-            if hasattr(obj, 'church_branch'):
-                return obj.church_branch == request.user.church_branch
-            # If object is the church branch itself
-            if obj.__class__.__name__ == 'ChurchBranch':
-                return obj == request.user.church_branch
-        
-        return False
\ No newline at end of file
+        user = request.user
+        return _BRANCH_RESOLVERS.get(user.role, _deny)(user, obj)
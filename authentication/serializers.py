@@ -1,13 +1,29 @@
+import hmac
+
 from rest_framework import serializers
-from django.contrib.auth.password_validation import validate_password
+from django.conf import settings
+from django.contrib.auth.password_validation import get_password_validators, validate_password
 from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import transaction
+from django.db.models import Q
 from .models import User, UserProfile
 
+# Password validators are built once per process instead of on every call
+_PASSWORD_VALIDATORS = get_password_validators(settings.AUTH_PASSWORD_VALIDATORS)
+
+
+def _validate_pw(value):
+    """Run the configured password validators"""
+    validate_password(value, password_validators=_PASSWORD_VALIDATORS)
+
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile"""
     
-    age = serializers.ReadOnlyField()
+    # Filled by UserProfileQuerySet.with_age() when the view annotates it
+    age = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = UserProfile
@@ -23,7 +39,7 @@ class UserSerializer(serializers.ModelSerializer):
     """Basic user serializer"""
     
     profile = UserProfileSerializer(read_only=True)
-    full_name = serializers.SerializerMethodField()
+    full_name = serializers.CharField(source='get_full_name', read_only=True)
     
     class Meta:
         model = User
@@ -33,9 +49,59 @@ class UserSerializer(serializers.ModelSerializer):
             'is_verified', 'is_active', 'profile', 'created_at'
         ]
         read_only_fields = ['id', 'created_at', 'is_verified', 'role']
+
+
+def bulk_register(rows):
+    """
+    Create many users and their empty profiles in two INSERTs
+    rows are validated UserRegistrationSerializer data
+    """
+    users = []
+    for row in rows:
+        user = User(
+            username=User.normalize_username(row['username']),
+            email=row['email'],
+            first_name=row['first_name'],
+            last_name=row['last_name'],
+            phone_number=row.get('phone_number', ''),
+        )
+        user.set_password(row['password'])
+        users.append(user)
+    
+    with transaction.atomic():
+        users = User.objects.bulk_create(users)
+        UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+    
+    return users
+
+
+class UserRegistrationListSerializer(serializers.ListSerializer):
+    """Batched registration: UserRegistrationSerializer(data=[...], many=True)"""
+    
+    def validate(self, attrs):
+        """Reject rows that repeat an email or username used earlier in the batch"""
+        seen_emails, seen_usernames = set(), set()
+        errors, has_errors = [], False
+        for row in attrs:
+            email = row['email']
+            username = User.normalize_username(row['username'])
+            row_errors = {}
+            if email in seen_emails:
+                row_errors['email'] = ["This email appears more than once in the batch."]
+            if username in seen_usernames:
+                row_errors['username'] = ["This username appears more than once in the batch."]
+            seen_emails.add(email)
+            seen_usernames.add(username)
+            errors.append(row_errors)
+            has_errors = has_errors or bool(row_errors)
+        if has_errors:
+            raise serializers.ValidationError(errors)
+        return attrs
     
-    def get_full_name(self, obj):
-        return obj.get_full_name()
+    def create(self, validated_data):
+        for row in validated_data:
+            row.pop('password_confirm', None)
+        return bulk_register(validated_data)
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -44,7 +110,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
         write_only=True,
         required=True,
-        validators=[validate_password],
+        validators=[_validate_pw],
         style={'input_type': 'password'}
     )
     password_confirm = serializers.CharField(
@@ -59,48 +125,71 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             'email', 'username', 'first_name', 'last_name',
             'phone_number', 'password', 'password_confirm'
         ]
+        list_serializer_class = UserRegistrationListSerializer
         extra_kwargs = {
             'first_name': {'required': True},
             'last_name': {'required': True},
+            # Uniqueness is checked in validate() with a single query
+            'email': {'validators': []},
+            'username': {'validators': [UnicodeUsernameValidator()]},
         }
     
     def validate(self, attrs):
-        """Validate passwords match"""
-        if attrs['password'] != attrs['password_confirm']:
+        """Validate passwords match and email/username are unique"""
+        if not hmac.compare_digest(attrs['password'].encode(), attrs['password_confirm'].encode()):
             raise serializers.ValidationError({
                 "password": "Password fields didn't match."
             })
+        
+        email, username = attrs['email'], attrs['username']
+        errors = {}
+        hits = User.objects.filter(
+            Q(email=email) | Q(username=username)
+        ).values_list('email', 'username')
+        for hit_email, hit_username in hits:
+            if hit_email == email:
+                errors['email'] = "This email is already registered."
+            if hit_username == username:
+                errors['username'] = "This username is already taken."
+        if errors:
+            raise serializers.ValidationError(errors)
         return attrs
     
     def validate_email(self, value):
-        """Ensure email is unique"""
-        if User.objects.filter(email=value.lower()).exists():
-            raise serializers.ValidationError("This email is already registered.")
+        """Normalize email"""
         return value.lower()
     
     def validate_username(self, value):
-        """Ensure username is unique"""
-        if User.objects.filter(username=value.lower()).exists():
-            raise serializers.ValidationError("This username is already taken.")
+        """Normalize username"""
         return value.lower()
     
+    def to_representation(self, instance):
+        """Respond with the read shape of the created user"""
+        return UserSerializer(instance, context=self.context).data
+    
     def create(self, validated_data):
         """Create user with hashed password"""
         # Remove password_confirm from validated data
         validated_data.pop('password_confirm')
         
-        # Create user
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            first_name=validated_data['first_name'],
-            last_name=validated_data['last_name'],
-            phone_number=validated_data.get('phone_number', ''),
-            password=validated_data['password']
-        )
+        # Hash before opening the transaction so no DB transaction is held
+        # for the hasher's run time. Hashing stays in the request: queuing it
+        # would put the raw password on the Celery broker.
+        password = make_password(validated_data['password'])
         
-        # Create empty profile
-        UserProfile.objects.create(user=user)
+        with transaction.atomic():
+            # Create user
+            user = User.objects.create(
+                username=User.normalize_username(validated_data['username']),
+                email=validated_data['email'],
+                first_name=validated_data['first_name'],
+                last_name=validated_data['last_name'],
+                phone_number=validated_data.get('phone_number', ''),
+                password=password
+            )
+            
+            # Create empty profile
+            UserProfile.objects.create(user=user)
         
         return user
 
@@ -123,25 +212,18 @@ class UserLoginSerializer(serializers.Serializer):
         if not email or not password:
             raise serializers.ValidationError("Must include email and password.")
         
-        # Get user by email
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            raise serializers.ValidationError("Invalid email or password.")
-        
         # Authenticate
-        # user = authenticate(username=user.username, password=password)
-        user = authenticate(request=self.context.get('request'), username=email, password=password)
-
+        user = authenticate(request=self.context.get('request'), email=email, password=password)
         
         if not user:
             raise serializers.ValidationError("Invalid email or password.")
         
-        if not user.is_active:
-            raise serializers.ValidationError("Account is deactivated.")
-        
         attrs['user'] = user
         return attrs
+    
+    def to_representation(self, attrs):
+        """Respond with the read shape of the authenticated user"""
+        return UserSerializer(attrs['user'], context=self.context).data
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -155,7 +237,7 @@ class ChangePasswordSerializer(serializers.Serializer):
     new_password = serializers.CharField(
         required=True,
         write_only=True,
-        validators=[validate_password],
+        validators=[_validate_pw],
         style={'input_type': 'password'}
     )
     new_password_confirm = serializers.CharField(
@@ -173,7 +255,7 @@ class ChangePasswordSerializer(serializers.Serializer):
     
     def validate(self, attrs):
         """Validate new passwords match"""
-        if attrs['new_password'] != attrs['new_password_confirm']:
+        if not hmac.compare_digest(attrs['new_password'].encode(), attrs['new_password_confirm'].encode()):
             raise serializers.ValidationError({
                 "new_password": "New password fields didn't match."
             })
@@ -183,7 +265,7 @@ class ChangePasswordSerializer(serializers.Serializer):
         """Update user password"""
         user = self.context['request'].user
         user.set_password(self.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password', 'updated_at'])
         return user
 
 
@@ -206,15 +288,20 @@ class UpdateProfileSerializer(serializers.ModelSerializer):
         # Update user fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        if validated_data:
+            instance.save(update_fields=[*validated_data, 'updated_at'])
         
         # Update profile if provided
         if profile_data and hasattr(instance, 'profile'):
             profile = instance.profile
             for attr, value in profile_data.items():
                 setattr(profile, attr, value)
-            profile.save()
+            profile.save(update_fields=[*profile_data, 'updated_at'])
         
         return instance
     
+    def to_representation(self, instance):
+        """Respond with the read shape of the updated user"""
+        return UserSerializer(instance, context=self.context).data
+    
 
@@ -3,178 +3,246 @@ Email Tasks for Account Management
 """
 
 from celery import shared_task
-from django.core.mail import send_mail, EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
 from django.conf import settings
-from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_encode
-from django.utils.encoding import force_bytes
+from smtplib import SMTPException
 import logging
 
 logger = logging.getLogger(__name__)
 
+# How long a sent task id is remembered to suppress duplicate sends on redelivery
+EMAIL_DEDUP_TIMEOUT = 60 * 60
 
-@shared_task(name='send_verification_email')
-def send_verification_email(user_id, verification_token, frontend_url):
+# Columns the email templates and subjects read
+_EMAIL_USER_FIELDS = ('id', 'email', 'first_name', 'last_name', 'church_branch__name')
+
+
+def _email_users():
+    """Users queryset loading the church branch and email columns in one query"""
+    from authentication.models import User
+    return User.objects.select_related('church_branch').only(*_EMAIL_USER_FIELDS)
+
+
+# Compiled templates, kept for the worker's lifetime
+_TEMPLATES = {}
+
+
+def _tpl(name):
+    """Return the compiled template, loading it on first use"""
+    template = _TEMPLATES.get(name)
+    if template is None:
+        template = _TEMPLATES[name] = get_template(name)
+    return template
+
+
+# Account email kinds: (HTML template, subject)
+EMAIL_SPECS = {
+    'verify': ('emails/verify_email.html', 'Verify your ChurchConnect account'),
+    'password_reset': ('emails/password_reset.html', 'Reset your ChurchConnect password'),
+    'welcome': ('emails/welcome.html', 'Welcome to ChurchConnect!'),
+    'password_changed': ('emails/password_changed.html', 'Your password has been changed'),
+}
+
+
+def _build_email(user, template, context, subject):
+    """
+    Render an HTML email with a plain-text fallback for one user
+    The text body comes from the sibling .txt template
+    The message is left unbound so callers can send it on a shared connection
+    """
+    context = {
+        'user': user,
+        'site_name': 'ChurchConnect',
+        'church_name': user.church_branch.name if user.church_branch else 'ChurchConnect',
+        **context,
+    }
+    html_content = _tpl(template).render(context)
+    text_content = _tpl(template.replace('.html', '.txt')).render(context)
+    
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+        connection=None
+    )
+    email.attach_alternative(html_content, "text/html")
+    return email
+
+
+@shared_task(
+    bind=True,
+    name='send_transactional_email',
+    acks_late=True,
+    autoretry_for=(SMTPException,),
+    retry_backoff=True,
+    max_retries=5,
+)
+def send_transactional_email(self, user_id, kind, context=None):
     """
-    Send email verification link
+    Send one of the account emails listed in EMAIL_SPECS
+    context carries the per-kind values, e.g. verification_url or reset_url
+    Batch many sends into few broker messages with
+    send_transactional_email.chunks([(uid, 'welcome', {}) for uid in ids], 100).apply_async()
+    
+    Acked after the send; a message redelivered after a worker crash is
+    skipped if its task id already went out. SMTP errors are retried.
     """
     from authentication.models import User
     
+    template, subject = EMAIL_SPECS[kind]
+    dedup_key = f"email:{kind}:{user_id}:{self.request.id}"
+    if self.request.id and not cache.add(dedup_key, True, timeout=EMAIL_DEDUP_TIMEOUT):
+        logger.info("Skipping duplicate %s email for user %s", kind, user_id)
+        return True
+    
     try:
-        user = User.objects.get(id=user_id)
-        
-        # Create verification URL
-        verification_url = f"{frontend_url}/verify-email/{verification_token}/"
+        user = _email_users().get(id=user_id)
         
-        # Render HTML email
-        html_content = render_to_string('emails/verify_email.html', {
-            'user': user,
-            'verification_url': verification_url,
-            'site_name': 'ChurchConnect',
-        })
-        text_content = strip_tags(html_content)
-        
-        # Create email
-        subject = 'Verify your ChurchConnect account'
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email]
-        )
-        email.attach_alternative(html_content, "text/html")
+        email = _build_email(user, template, context or {}, subject)
         email.send()
         
-        logger.info(f"Verification email sent to {user.email}")
+        logger.info("%s email sent to %s", kind, user.email)
         return True
         
     except User.DoesNotExist:
-        logger.error(f"User {user_id} not found")
+        logger.error("User %s not found", user_id)
         return False
+    except SMTPException:
+        # Release the key so the retry can send
+        cache.delete(dedup_key)
+        raise
     except Exception as e:
-        logger.error(f"Failed to send verification email: {str(e)}")
+        logger.error("Failed to send %s email: %s", kind, e)
         return False
 
 
-@shared_task(name='send_password_reset_email')
-def send_password_reset_email(user_id, reset_token, frontend_url):
+@shared_task(name='create_and_send_verification')
+def create_and_send_verification(user_id, frontend_url):
     """
-    Send password reset link
+    Create an email verification token and send the verification link
+    Keeps token generation and email delivery off the registration request
     """
-    from authentication.models import User
+    from django.utils import timezone
+    from datetime import timedelta
+    from authentication.models import EmailVerificationToken
     
     try:
-        user = User.objects.get(id=user_id)
-        
-        # Create reset URL
-        reset_url = f"{frontend_url}/reset-password/{reset_token}/"
-        
-        # Render HTML email
-        html_content = render_to_string('emails/password_reset.html', {
-            'user': user,
-            'reset_url': reset_url,
-            'site_name': 'ChurchConnect',
-        })
-        text_content = strip_tags(html_content)
-        
-        # Create email
-        subject = 'Reset your ChurchConnect password'
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email]
+        token = EmailVerificationToken.generate_token()
+        EmailVerificationToken.objects.create(
+            user_id=user_id,
+            token=token,
+            expires_at=timezone.now() + timedelta(hours=24)
         )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
-        
-        logger.info(f"Password reset email sent to {user.email}")
-        return True
-        
-    except User.DoesNotExist:
-        logger.error(f"User {user_id} not found")
-        return False
     except Exception as e:
-        logger.error(f"Failed to send password reset email: {str(e)}")
+        logger.error("Failed to create verification token: %s", e)
         return False
+    
+    send_transactional_email.delay(
+        user_id, 'verify', {'verification_url': f"{frontend_url}/verify-email/{token}/"}
+    )
+    return True
 
 
-@shared_task(name='send_welcome_email')
-def send_welcome_email(user_id):
+@shared_task(name='create_and_send_password_reset')
+def create_and_send_password_reset(user_id, frontend_url):
     """
-    Send welcome email to new users
+    Invalidate the user's outstanding reset tokens, create a new one and
+    send the reset link
+    Keeps the token writes off the password reset request
     """
-    from authentication.models import User
+    from django.utils import timezone
+    from datetime import timedelta
+    from authentication.models import PasswordResetToken
     
     try:
-        user = User.objects.get(id=user_id)
-        
-        # Render HTML email
-        html_content = render_to_string('emails/welcome.html', {
-            'user': user,
-            'site_name': 'ChurchConnect',
-            'church_name': user.church_branch.name if user.church_branch else 'ChurchConnect',
-        })
-        text_content = strip_tags(html_content)
-        
-        # Create email
-        subject = f'Welcome to ChurchConnect!'
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email]
+        # One UPDATE however many stale tokens exist
+        PasswordResetToken.objects.filter(user_id=user_id, used=False).update(used=True)
+        
+        token = PasswordResetToken.generate_token()
+        PasswordResetToken.objects.create(
+            user_id=user_id,
+            token=token,
+            expires_at=timezone.now() + timedelta(hours=1)
         )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
+    except Exception as e:
+        logger.error("Failed to create password reset token: %s", e)
+        return False
+    
+    send_transactional_email.delay(
+        user_id, 'password_reset', {'reset_url': f"{frontend_url}/reset-password/{token}/"}
+    )
+    return True
+
+
+@shared_task(name='send_bulk_emails')
+def send_bulk_emails(user_ids, template_name, subject, extra_context=None):
+    """
+    Send the same templated email to many users over one SMTP connection
+    Use instead of enqueuing one task per user, e.g.
+    send_bulk_emails.delay(user_ids, 'emails/welcome.html', 'Welcome to ChurchConnect!')
+    """
+    try:
+        users = _email_users().filter(id__in=user_ids)
+        messages = [
+            _build_email(user, template_name, extra_context or {}, subject)
+            for user in users
+        ]
+        if not messages:
+            return 0
         
-        logger.info(f"Welcome email sent to {user.email}")
-        return True
+        with get_connection() as connection:
+            sent = connection.send_messages(messages)
+        
+        logger.info("Bulk email '%s' sent to %s users", subject, sent)
+        return sent
         
-    except User.DoesNotExist:
-        logger.error(f"User {user_id} not found")
-        return False
     except Exception as e:
-        logger.error(f"Failed to send welcome email: {str(e)}")
+        logger.error("Failed to send bulk emails: %s", e)
+        return 0
+
+
+@shared_task(name='blacklist_refresh_token')
+def blacklist_refresh_token(refresh_token):
+    """
+    Blacklist a refresh token on logout
+    Keeps the OutstandingToken/BlacklistedToken writes off the logout request
+    """
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.tokens import RefreshToken
+    
+    try:
+        RefreshToken(refresh_token).blacklist()
+        return True
+    except TokenError as e:
+        # Expired, malformed or already blacklisted: nothing left to revoke
+        logger.info("Refresh token not blacklisted: %s", e)
         return False
 
 
-@shared_task(name='send_password_changed_email')
-def send_password_changed_email(user_id):
+@shared_task(name='cleanup_expired_tokens')
+def cleanup_expired_tokens():
     """
-    Notify user that their password was changed
+    Purge used or expired verification and password reset tokens
+    Runs daily at 3 AM via Celery Beat
     """
-    from authentication.models import User
+    from django.db.models import Q
+    from django.utils import timezone
+    from authentication.models import EmailVerificationToken, PasswordResetToken
     
     try:
-        user = User.objects.get(id=user_id)
-        
-        # Render HTML email
-        html_content = render_to_string('emails/password_changed.html', {
-            'user': user,
-            'site_name': 'ChurchConnect',
-        })
-        text_content = strip_tags(html_content)
+        stale = Q(used=True) | Q(expires_at__lt=timezone.now())
+        verification_deleted, _ = EmailVerificationToken.objects.filter(stale).delete()
+        reset_deleted, _ = PasswordResetToken.objects.filter(stale).delete()
         
-        # Create email
-        subject = 'Your password has been changed'
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email]
+        logger.info(
+            "Token cleanup: %s verification, %s password reset tokens deleted",
+            verification_deleted, reset_deleted
         )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
+        return verification_deleted + reset_deleted
         
-        logger.info(f"Password changed notification sent to {user.email}")
-        return True
-        
-    except User.DoesNotExist:
-        logger.error(f"User {user_id} not found")
-        return False
     except Exception as e:
-        logger.error(f"Failed to send password changed email: {str(e)}")
-        return False
\ No newline at end of file
+        logger.error("Failed to cleanup tokens: %s", e)
+        return 0
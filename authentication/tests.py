@@ -1,3 +1,97 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import EmailVerificationToken, PasswordResetToken, User
+from .serializers import UserRegistrationSerializer
+
+
+class SingleUseTokenTests(TestCase):
+    """consume() redeems a token at most once, and only before it expires"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='grace', email='grace@example.com', password='Str0ng-Passw0rd!'
+        )
+
+    def make_token(self, model, expires_in=timedelta(hours=1)):
+        return model.objects.create(
+            user=self.user,
+            token=model.generate_token(),
+            expires_at=timezone.now() + expires_in,
+        )
+
+    def test_consume_returns_token_with_user(self):
+        for model in (EmailVerificationToken, PasswordResetToken):
+            with self.subTest(model=model.__name__):
+                token = self.make_token(model)
+                consumed = model.consume(token.token)
+                self.assertEqual(consumed.pk, token.pk)
+                self.assertTrue(consumed.used)
+                self.assertEqual(consumed.user, self.user)
+
+    def test_consume_twice_fails_second_time(self):
+        for model in (EmailVerificationToken, PasswordResetToken):
+            with self.subTest(model=model.__name__):
+                token = self.make_token(model)
+                self.assertIsNotNone(model.consume(token.token))
+                self.assertIsNone(model.consume(token.token))
+
+    def test_consume_expired_token_fails(self):
+        for model in (EmailVerificationToken, PasswordResetToken):
+            with self.subTest(model=model.__name__):
+                token = self.make_token(model, expires_in=timedelta(seconds=-1))
+                self.assertIsNone(model.consume(token.token))
+                token.refresh_from_db()
+                self.assertFalse(token.used)
+
+    def test_consume_unknown_token_fails(self):
+        self.assertIsNone(EmailVerificationToken.consume('no-such-token'))
+
+
+class BatchRegistrationTests(TestCase):
+    """UserRegistrationSerializer(many=True) validates rows against each other too"""
+
+    def row(self, email, username):
+        return {
+            'email': email,
+            'username': username,
+            'first_name': 'Test',
+            'last_name': 'User',
+            'password': 'Str0ng-Passw0rd!',
+            'password_confirm': 'Str0ng-Passw0rd!',
+        }
+
+    def test_duplicate_email_in_batch_is_rejected_on_its_row(self):
+        serializer = UserRegistrationSerializer(data=[
+            self.row('ada@example.com', 'ada'),
+            self.row('ADA@example.com', 'ada2'),
+        ], many=True)
+        self.assertFalse(serializer.is_valid())
+        row_errors = serializer.errors['non_field_errors']
+        self.assertEqual(row_errors[0], {})
+        self.assertIn('email', row_errors[1])
+        self.assertNotIn('username', row_errors[1])
+
+    def test_duplicate_username_in_batch_is_rejected_on_its_row(self):
+        serializer = UserRegistrationSerializer(data=[
+            self.row('ada@example.com', 'ada'),
+            self.row('bea@example.com', 'Ada'),
+        ], many=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('username', serializer.errors['non_field_errors'][1])
 
-# Create your tests here.
+    def test_distinct_rows_are_created_with_profiles(self):
+        serializer = UserRegistrationSerializer(data=[
+            self.row('ada@example.com', 'ada'),
+            self.row('bea@example.com', 'bea'),
+        ], many=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        users = serializer.save()
+        self.assertEqual(len(users), 2)
+        self.assertEqual(
+            set(User.objects.filter(profile__isnull=False).values_list('username', flat=True)),
+            {'ada', 'bea'}
+        )
@@ -1,251 +1,3 @@
-# from rest_framework import status, generics
-# from rest_framework.response import Response
-# from rest_framework.permissions import AllowAny, IsAuthenticated
-# from rest_framework.views import APIView
-# from rest_framework_simplejwt.tokens import RefreshToken
-# from django.contrib.auth import logout
-
-# from .models import User
-# from .serializers import (
-#     UserRegistrationSerializer,
-#     UserLoginSerializer,
-#     UserSerializer,
-#     ChangePasswordSerializer,
-#     UpdateProfileSerializer
-# )
-
-
-# class RegisterView(generics.CreateAPIView):
-    
-#     queryset = User.objects.all()
-#     serializer_class = UserRegistrationSerializer
-#     permission_classes = [AllowAny]
-    
-#     def create(self, request, *args, **kwargs):
-#         """Handle user registration"""
-#         serializer = self.get_serializer(data=request.data)
-#         serializer.is_valid(raise_exception=True)
-#         user = serializer.save()
-        
-#         # Generate JWT tokens
-#         refresh = RefreshToken.for_user(user)
-        
-#         # Prepare response data
-#         user_data = UserSerializer(user).data
-        
-#         return Response({
-#             'success': True,
-#             'message': 'Registration successful! Welcome to ChurchConnect.',
-#             'data': {
-#                 'user': user_data,
-#                 'tokens': {
-#                     'refresh': str(refresh),
-#                     'access': str(refresh.access_token),
-#                 }
-#             }
-#         }, status=status.HTTP_201_CREATED)
-
-
-# class LoginView(APIView):
-#     """
-#     API endpoint for user login
-#     POST /api/auth/login/
-#     """
-#     permission_classes = [AllowAny]
-#     serializer_class = UserLoginSerializer
-    
-#     def post(self, request):
-#         """Handle user login"""
-#         serializer = self.serializer_class(data=request.data)
-#         serializer.is_valid(raise_exception=True)
-        
-#         user = serializer.validated_data['user']
-        
-#         # Generate JWT tokens
-#         refresh = RefreshToken.for_user(user)
-        
-#         # Prepare response data
-#         user_data = UserSerializer(user).data
-        
-#         return Response({
-#             'success': True,
-#             'message': 'Login successful!',
-#             'data': {
-#                 'user': user_data,
-#                 'tokens': {
-#                     'refresh': str(refresh),
-#                     'access': str(refresh.access_token),
-#                 }
-#             }
-#         }, status=status.HTTP_200_OK)
-
-
-# class LogoutView(APIView):
-#     """
-#     API endpoint for user logout
-#     POST /api/auth/logout/
-#     """
-#     permission_classes = [IsAuthenticated]
-    
-#     def post(self, request):
-#         """Handle user logout"""
-#         try:
-#             # Get refresh token from request
-#             refresh_token = request.data.get('refresh_token')
-            
-#             if refresh_token:
-#                 # Blacklist the refresh token
-#                 token = RefreshToken(refresh_token)
-#                 token.blacklist()
-            
-#             # Logout user from Django session
-#             logout(request)
-            
-#             return Response({
-#                 'success': True,
-#                 'message': 'Logout successful!'
-#             }, status=status.HTTP_200_OK)
-        
-#         except Exception as e:
-#             return Response({
-#                 'success': False,
-#                 'message': 'An error occurred during logout.',
-#                 'error': str(e)
-#             }, status=status.HTTP_400_BAD_REQUEST)
-
-
-# class ProfileView(generics.RetrieveUpdateAPIView):
-#     """
-#     API endpoint to get and update user profile
-#     GET /api/auth/profile/
-#     PUT/PATCH /api/auth/profile/
-#     """
-#     permission_classes = [IsAuthenticated]
-#     serializer_class = UpdateProfileSerializer
-    
-#     def get_object(self):
-#         """Return the current authenticated user"""
-#         return self.request.user
-    
-#     def retrieve(self, request, *args, **kwargs):
-#         """Get current user profile"""
-#         user = self.get_object()
-#         serializer = UserSerializer(user)
-        
-#         return Response({
-#             'success': True,
-#             'data': serializer.data
-#         }, status=status.HTTP_200_OK)
-    
-#     def update(self, request, *args, **kwargs):
-#         """Update user profile"""
-#         partial = kwargs.pop('partial', False)
-#         instance = self.get_object()
-#         serializer = self.get_serializer(instance, data=request.data, partial=partial)
-#         serializer.is_valid(raise_exception=True)
-#         self.perform_update(serializer)
-        
-#         # Return updated user data
-#         user_serializer = UserSerializer(instance)
-        
-#         return Response({
-#             'success': True,
-#             'message': 'Profile updated successfully!',
-#             'data': user_serializer.data
-#         }, status=status.HTTP_200_OK)
-
-
-# class ChangePasswordView(APIView):
-#     """
-#     API endpoint to change user password
-#     POST /api/auth/change-password/
-#     """
-#     permission_classes = [IsAuthenticated]
-#     serializer_class = ChangePasswordSerializer
-    
-#     def post(self, request):
-#         """Handle password change"""
-#         serializer = self.serializer_class(
-#             data=request.data,
-#             context={'request': request}
-#         )
-#         serializer.is_valid(raise_exception=True)
-#         serializer.save()
-        
-#         return Response({
-#             'success': True,
-#             'message': 'Password changed successfully!'
-#         }, status=status.HTTP_200_OK)
-
-
-# class UserListView(generics.ListAPIView):
-#     """
-#     API endpoint to list all users (Admin only)
-#     GET /api/auth/users/
-#     """
-#     queryset = User.objects.all()
-#     serializer_class = UserSerializer
-#     permission_classes = [IsAuthenticated]
-    
-#     def get_queryset(self):
-#         """Filter users based on role"""
-#         user = self.request.user
-#         queryset = super().get_queryset()
-        
-#         # Super admin can see all users
-#         if user.is_super_admin():
-#             return queryset
-        
-#         # Denomination admin sees users in their denomination
-#         # if user.is_denomination_admin() and user.denomination:
-#         #     return queryset.filter(denomination=user.denomination)
-        
-#         # Church admin sees users in their church
-#         # if user.is_church_admin() and user.church_branch:
-#         #     return queryset.filter(church_branch=user.church_branch)
-        
-#         # Regular members only see themselves
-#         return queryset.filter(id=user.id)
-    
-#     def list(self, request, *args, **kwargs):
-#         """List users with custom response"""
-#         queryset = self.filter_queryset(self.get_queryset())
-#         page = self.paginate_queryset(queryset)
-        
-#         if page is not None:
-#             serializer = self.get_serializer(page, many=True)
-#             return self.get_paginated_response(serializer.data)
-        
-#         serializer = self.get_serializer(queryset, many=True)
-        
-#         return Response({
-#             'success': True,
-#             'count': queryset.count(),
-#             'data': serializer.data
-#         }, status=status.HTTP_200_OK)
-
-
-# class UserDetailView(generics.RetrieveAPIView):
-#     """
-#     API endpoint to get a specific user's details
-#     GET /api/auth/users/<id>/
-#     """
-#     queryset = User.objects.all()
-#     serializer_class = UserSerializer
-#     permission_classes = [IsAuthenticated]
-#     lookup_field = 'id'
-    
-#     def retrieve(self, request, *args, **kwargs):
-#         """Get user details"""
-#         instance = self.get_object()
-#         serializer = self.get_serializer(instance)
-        
-#         return Response({
-#             'success': True,
-#             'data': serializer.data
-#         }, status=status.HTTP_200_OK)
-    
-
 """
 Authentication Views using Class-Based Views (CBVs)
 All views are classes for better code organization
@@ -254,13 +6,18 @@ All views are classes for better code organization
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.throttling import AnonRateThrottle
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import logout
-from django.utils import timezone
-from datetime import timedelta
-
-from .models import User, EmailVerificationToken, PasswordResetToken
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+
+from .authentication import invalidate_cached_user, profile_data_cache_key
+from .models import User, UserProfile, EmailVerificationToken, PasswordResetToken
+from .pagination import UserCursorPagination
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -270,6 +27,18 @@ from .serializers import (
 )
 
 
+# Columns UserSerializer reads
+_USER_SERIALIZER_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'phone_number',
+    'profile_image', 'role', 'is_verified', 'is_active', 'created_at'
+)
+
+
+def _profiles_with_age():
+    """Prefetch profiles with age computed by the database"""
+    return Prefetch('profile', queryset=UserProfile.objects.with_age())
+
+
 class RegisterView(generics.CreateAPIView):
     """
     API endpoint for user registration
@@ -285,17 +54,19 @@ class RegisterView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         
+        # Create verification token and send email asynchronously
+        from .tasks import create_and_send_verification
+        frontend_url = request.data.get('frontend_url', 'http://localhost:3000')
+        create_and_send_verification.delay(user.id, frontend_url)
+        
         # Generate JWT tokens
         refresh = RefreshToken.for_user(user)
         
-        # Prepare response data
-        user_data = UserSerializer(user).data
-        
         return Response({
             'success': True,
             'message': 'Registration successful! Welcome to ChurchConnect.',
             'data': {
-                'user': user_data,
+                'user': serializer.data,
                 'tokens': {
                     'refresh': str(refresh),
                     'access': str(refresh.access_token),
@@ -322,14 +93,11 @@ class LoginView(APIView):
         # Generate JWT tokens
         refresh = RefreshToken.for_user(user)
         
-        # Prepare response data
-        user_data = UserSerializer(user).data
-        
         return Response({
             'success': True,
             'message': 'Login successful!',
             'data': {
-                'user': user_data,
+                'user': serializer.data,
                 'tokens': {
                     'refresh': str(refresh),
                     'access': str(refresh.access_token),
@@ -352,9 +120,9 @@ class LogoutView(APIView):
             refresh_token = request.data.get('refresh_token')
             
             if refresh_token:
-                # Blacklist the refresh token
-                token = RefreshToken(refresh_token)
-                token.blacklist()
+                # Blacklist the refresh token in the background
+                from .tasks import blacklist_refresh_token
+                blacklist_refresh_token.delay(refresh_token)
             
             # Logout user from Django session
             logout(request)
@@ -381,6 +149,9 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UpdateProfileSerializer
     
+    # Seconds the serialized profile is reused between changes
+    PROFILE_CACHE_TIMEOUT = 300
+    
     def get_object(self):
         """Return the current authenticated user"""
         return self.request.user
@@ -388,11 +159,15 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     def retrieve(self, request, *args, **kwargs):
         """Get current user profile"""
         user = self.get_object()
-        serializer = UserSerializer(user)
+        key = profile_data_cache_key(user.id)
+        data = cache.get(key)
+        if data is None:
+            data = UserSerializer(user).data
+            cache.set(key, data, self.PROFILE_CACHE_TIMEOUT)
         
         return Response({
             'success': True,
-            'data': serializer.data
+            'data': data
         }, status=status.HTTP_200_OK)
     
     def update(self, request, *args, **kwargs):
@@ -402,14 +177,13 @@ class ProfileView(generics.RetrieveUpdateAPIView):
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+        invalidate_cached_user(instance.id)
         
         # Return updated user data
-        user_serializer = UserSerializer(instance)
-        
         return Response({
             'success': True,
             'message': 'Profile updated successfully!',
-            'data': user_serializer.data
+            'data': serializer.data
         }, status=status.HTTP_200_OK)
 
 
@@ -428,7 +202,8 @@ class ChangePasswordView(APIView):
             context={'request': request}
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        user = serializer.save()
+        invalidate_cached_user(user.id)
         
         return Response({
             'success': True,
@@ -444,11 +219,14 @@ class UserListView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = UserCursorPagination
     
     def get_queryset(self):
         """Filter users based on role"""
         user = self.request.user
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().only(
+            *_USER_SERIALIZER_FIELDS
+        ).prefetch_related(_profiles_with_age())
         
         # Super admin can see all users
         if user.is_super_admin():
@@ -467,20 +245,17 @@ class UserListView(generics.ListAPIView):
     
     def list(self, request, *args, **kwargs):
         """List users with custom response"""
-        queryset = self.filter_queryset(self.get_queryset())
+        if request.user.is_super_admin():
+            queryset = self.filter_queryset(self.get_queryset())
+        else:
+            # Regular members only see themselves: reuse the authenticated
+            # user instead of querying for it again
+            queryset = [request.user]
+        # Always paginated: UserCursorPagination has a fixed page size, so the
+        # full user table is never loaded into memory at once
         page = self.paginate_queryset(queryset)
-        
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(queryset, many=True)
-        
-        return Response({
-            'success': True,
-            'count': queryset.count(),
-            'data': serializer.data
-        }, status=status.HTTP_200_OK)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 class UserDetailView(generics.RetrieveAPIView):
@@ -493,6 +268,12 @@ class UserDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     lookup_field = 'id'
     
+    def get_queryset(self):
+        """Load the serialized columns and the profile with its age"""
+        return super().get_queryset().only(
+            *_USER_SERIALIZER_FIELDS
+        ).prefetch_related(_profiles_with_age())
+    
     def retrieve(self, request, *args, **kwargs):
         """Get user details"""
         instance = self.get_object()
@@ -520,33 +301,32 @@ class VerifyEmailView(APIView):
                 'message': 'Token is required.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            verification = EmailVerificationToken.objects.get(token=token)
-            
-            if not verification.is_valid():
-                return Response({
-                    'success': False,
-                    'message': 'This verification link has expired or been used.'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Mark user as verified
-            user = verification.user
-            user.is_verified = True
-            user.save()
-            
-            # Mark token as used
-            verification.mark_as_used()
+        with transaction.atomic():
+            # Mark token as used; only one request can consume it
+            verification = EmailVerificationToken.consume(token)
             
-            return Response({
-                'success': True,
-                'message': 'Email verified successfully!'
-            }, status=status.HTTP_200_OK)
-            
-        except EmailVerificationToken.DoesNotExist:
+            if verification is not None:
+                # Mark user as verified
+                user = verification.user
+                user.is_verified = True
+                user.save(update_fields=['is_verified', 'updated_at'])
+        
+        if verification is None:
+            if EmailVerificationToken.objects.filter(token=token).exists():
+                message = 'This verification link has expired or been used.'
+            else:
+                message = 'Invalid verification token.'
             return Response({
                 'success': False,
-                'message': 'Invalid verification token.'
+                'message': message
             }, status=status.HTTP_400_BAD_REQUEST)
+        
+        invalidate_cached_user(user.id)
+        
+        return Response({
+            'success': True,
+            'message': 'Email verified successfully!'
+        }, status=status.HTTP_200_OK)
 
 
 class RequestPasswordResetView(APIView):
@@ -555,6 +335,10 @@ class RequestPasswordResetView(APIView):
     POST /api/auth/request-password-reset/
     """
     permission_classes = [AllowAny]
+    throttle_classes = [AnonRateThrottle]
+    
+    # Seconds a repeat request for the same email is answered without the DB
+    RESEND_INTERVAL = 60
     
     def post(self, request):
         """Send password reset email"""
@@ -566,23 +350,20 @@ class RequestPasswordResetView(APIView):
                 'message': 'Email is required.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        # Repeat requests within the interval get the generic reply
+        if not cache.add(f"pwreset:{email}", True, timeout=self.RESEND_INTERVAL):
+            return Response({
+                'success': True,
+                'message': 'If that email exists, a reset link has been sent.'
+            }, status=status.HTTP_200_OK)
+        
         try:
-            user = User.objects.get(email=email)
-            
-            # Create reset token
-            token = PasswordResetToken.generate_token()
-            expires_at = timezone.now() + timedelta(hours=1)
-            
-            PasswordResetToken.objects.create(
-                user=user,
-                token=token,
-                expires_at=expires_at
-            )
+            user = User.objects.only('id').get(email=email)
             
-            # Send email asynchronously
-            from .tasks import send_password_reset_email
+            # Create the token and send the email asynchronously
+            from .tasks import create_and_send_password_reset
             frontend_url = request.data.get('frontend_url', 'http://localhost:3000')
-            send_password_reset_email.delay(user.id, token, frontend_url)
+            create_and_send_password_reset.delay(user.id, frontend_url)
             
             return Response({
                 'success': True,
@@ -615,34 +396,36 @@ class ResetPasswordView(APIView):
                 'message': 'Token and new password are required.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            reset_token = PasswordResetToken.objects.get(token=token)
-            
-            if not reset_token.is_valid():
-                return Response({
-                    'success': False,
-                    'message': 'This reset link has expired or been used.'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Update password
-            user = reset_token.user
-            user.set_password(new_password)
-            user.save()
-            
-            # Mark token as used
-            reset_token.mark_as_used()
-            
-            # Send notification email
-            from .tasks import send_password_changed_email
-            send_password_changed_email.delay(user.id)
-            
-            return Response({
-                'success': True,
-                'message': 'Password reset successfully!'
-            }, status=status.HTTP_200_OK)
+        # Hash before taking the token row lock
+        password = make_password(new_password)
+        
+        with transaction.atomic():
+            # Mark token as used; only one request can consume it
+            reset_token = PasswordResetToken.consume(token)
             
-        except PasswordResetToken.DoesNotExist:
+            if reset_token is not None:
+                # Update password
+                user = reset_token.user
+                user.password = password
+                user.save(update_fields=['password', 'updated_at'])
+        
+        if reset_token is None:
+            if PasswordResetToken.objects.filter(token=token).exists():
+                message = 'This reset link has expired or been used.'
+            else:
+                message = 'Invalid reset token.'
             return Response({
                 'success': False,
-                'message': 'Invalid reset token.'
-            }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+                'message': message
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        invalidate_cached_user(user.id)
+        
+        # Send notification email
+        from .tasks import send_transactional_email
+        send_transactional_email.delay(user.id, 'password_changed')
+        
+        return Response({
+            'success': True,
+            'message': 'Password reset successfully!'
+        }, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -2,24 +2,159 @@
 WebSocket Consumers for Real-time Features
 """
 
+import asyncio
 import json
+import logging
+import msgpack
+import time
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from common import db
+from community.models import (
+    GroupMember, ChatMessage, MEMBERSHIP_CACHE_TIMEOUT, membership_cache_key
+)
+from events.models import Event, RSVP, EventAttendance
+from notification.models import Notification
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
+# Hot read-only queries run on the asyncpg pool rather than the ORM, whose
+# async methods still hop onto Django's single sync thread
+MEMBERSHIP_SQL = (
+    f'SELECT 1 FROM {GroupMember._meta.db_table} '
+    'WHERE group_id = $1 AND user_id = $2'
+)
+EVENT_STATS_SQL = (
+    'SELECT e.max_attendees, '
+    f'(SELECT COUNT(*) FROM {RSVP._meta.db_table} r WHERE r.event_id = e.id AND r.status = $2) AS total_rsvps, '
+    f'(SELECT COUNT(*) FROM {EventAttendance._meta.db_table} a WHERE a.event_id = e.id AND a.checked_in) AS total_checked_in '
+    f'FROM {Event._meta.db_table} e WHERE e.id = $1'
+)
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+# How long a user's notification channel name stays registered
+NOTIFICATION_CHANNEL_TIMEOUT = 60 * 60 * 24
+
+
+def notification_channel_key(user_id):
+    """Cache key holding the channel name of a user's notification socket"""
+    return f'ws:user:{user_id}'
+
+
+class ChatMessageWriter:
+    """
+    Coalesces chat message inserts for this process into bulk writes
+    Messages are flushed every FLUSH_INTERVAL seconds or once
+    BATCH_SIZE are waiting, whichever comes first
+    """
+    
+    FLUSH_INTERVAL = 0.05
+    BATCH_SIZE = 100
+    
+    def __init__(self):
+        self._queue = asyncio.Queue()
+        self._task = None
+    
+    def start(self):
+        """Start the flush loop on the running event loop if it isn't running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    def put(self, chat_message):
+        """Queue an unsaved ChatMessage for the next flush"""
+        self._queue.put_nowait(chat_message)
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.FLUSH_INTERVAL
+            while len(batch) < self.BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await ChatMessage.objects.abulk_create(batch)
+            except Exception:
+                logger.exception(f"Failed to bulk save {len(batch)} chat messages, saving one by one")
+                await self._save_each(batch)
+    
+    async def _save_each(self, batch):
+        """Fallback after a failed bulk write: one bad row must not lose the others"""
+        for chat_message in batch:
+            try:
+                await ChatMessage.objects.abulk_create([chat_message])
+            except Exception:
+                logger.exception(f"Failed to save chat message {chat_message.uuid}")
+
+
+chat_message_writer = ChatMessageWriter()
+
+
+class FramedConsumer(AsyncWebsocketConsumer):
+    """
+    Base consumer that speaks JSON text frames or MessagePack binary frames
+    Clients opt into MessagePack by requesting the 'msgpack' subprotocol;
+    everyone else keeps getting JSON
+    """
+    
+    MSGPACK_SUBPROTOCOL = 'msgpack'
+    use_msgpack = False
+    
+    async def accept(self, subprotocol=None):
+        """Accept the connection, negotiating the frame format"""
+        if self.MSGPACK_SUBPROTOCOL in self.scope.get('subprotocols', []):
+            self.use_msgpack = True
+            subprotocol = self.MSGPACK_SUBPROTOCOL
+        await super().accept(subprotocol)
+    
+    async def send_payload(self, payload):
+        """Send a payload in the negotiated format"""
+        if self.use_msgpack:
+            await self.send(bytes_data=msgpack.packb(payload, use_bin_type=True))
+        else:
+            await self.send(text_data=json.dumps(payload))
+    
+    @staticmethod
+    def encode_payload(payload):
+        """Encode a payload once in both formats, for group fanout"""
+        return {
+            'text': json.dumps(payload),
+            'bytes': msgpack.packb(payload, use_bin_type=True)
+        }
+    
+    async def send_encoded(self, frames):
+        """Send a payload already encoded by encode_payload"""
+        if self.use_msgpack:
+            await self.send(bytes_data=frames['bytes'])
+        else:
+            await self.send(text_data=frames['text'])
+    
+    def decode_payload(self, text_data=None, bytes_data=None):
+        """Decode an inbound frame; raises ValueError or UnpackException"""
+        if bytes_data is not None:
+            return msgpack.unpackb(bytes_data, raw=False)
+        return json.loads(text_data)
+
+
+class NotificationConsumer(FramedConsumer):
     """
     Consumer for personal notifications
-    Each user has their own notification channel
+    Each user has their own notification channel, registered in the cache
+    so tasks can send to it directly instead of through a per-user group
     """
     
     async def connect(self):
         """Handle WebSocket connection"""
         self.user_id = self.scope['url_route']['kwargs']['user_id']
-        self.room_group_name = f'notifications_{self.user_id}'
         
         # Authenticate user
         user = self.scope.get('user')
@@ -32,71 +167,73 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
-        # Join room group
-        await self.channel_layer.group_add(
-            self.room_group_name,
-            self.channel_name
-        )
-        
         await self.accept()
         
+        # Register this channel as the user's notification target
+        await cache.aset(
+            notification_channel_key(self.user_id),
+            self.channel_name,
+            NOTIFICATION_CHANNEL_TIMEOUT
+        )
+        
         # Send welcome message
-        await self.send(text_data=json.dumps({
+        await self.send_payload({
             'type': 'connection_established',
             'message': 'Connected to notifications'
-        }))
+        })
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection"""
-        # Leave room group
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        # Unregister unless a newer connection has taken over
+        key = notification_channel_key(self.user_id)
+        if await cache.aget(key) == self.channel_name:
+            await cache.adelete(key)
     
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         """Receive message from WebSocket"""
         try:
-            data = json.loads(text_data)
+            data = self.decode_payload(text_data, bytes_data)
             message_type = data.get('type', 'unknown')
             
             # Handle different message types
             if message_type == 'mark_read':
-                notification_id = data.get('notification_id')
-                await self.mark_notification_read(notification_id)
+                # {'ids': [...]}; a single 'notification_id' is still accepted
+                notification_ids = data.get('ids', [data.get('notification_id')])
+                if not isinstance(notification_ids, list):
+                    raise ValueError('ids must be a list')
+                await self.mark_notifications_read(notification_ids)
             
-        except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({
+        except (ValueError, msgpack.UnpackException):
+            await self.send_payload({
                 'type': 'error',
-                'message': 'Invalid JSON'
-            }))
+                'message': 'Invalid message format'
+            })
     
     async def notification_message(self, event):
-        """Receive notification from room group"""
+        """Receive notification sent to this channel"""
         # Send notification to WebSocket
-        await self.send(text_data=json.dumps({
+        await self.send_payload({
             'type': 'notification',
             'notification': event['notification']
-        }))
+        })
     
-    @database_sync_to_async
-    def mark_notification_read(self, notification_id):
-        """Mark notification as read"""
-        from notification.models import Notification
-        try:
-            notification = Notification.objects.get(id=notification_id)
-            notification.read = True
-            notification.save()
-            return True
-        except Notification.DoesNotExist:
-            return False
+    async def mark_notifications_read(self, notification_ids):
+        """Mark the user's own notifications as read in a single UPDATE"""
+        return await Notification.objects.filter(
+            id__in=notification_ids,
+            recipient_id=self.user_id,
+            is_read=False
+        ).aupdate(is_read=True, read_at=timezone.now())
 
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ChatConsumer(FramedConsumer):
     """
     Consumer for group/community chat
     """
     
+    # Messages a user may send per second before the rest are dropped
+    RATE_LIMIT = 10
+    
     async def connect(self):
         """Handle WebSocket connection"""
         self.group_id = self.scope['url_route']['kwargs']['group_id']
@@ -108,6 +245,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
+        # Display name used in every payload this connection sends
+        self.username = user.get_full_name()
+        
         # Check if user is member of this group
         is_member = await self.check_group_membership(user.id, self.group_id)
         if not is_member:
@@ -120,6 +260,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
         
+        chat_message_writer.start()
         await self.accept()
         
         # Notify group that user joined
@@ -128,7 +269,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             {
                 'type': 'user_joined',
                 'user_id': user.id,
-                'username': user.get_full_name()
+                'username': self.username
             }
         )
     
@@ -143,7 +284,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 {
                     'type': 'user_left',
                     'user_id': user.id,
-                    'username': user.get_full_name()
+                    'username': self.username
                 }
             )
         
@@ -153,96 +294,131 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
     
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         """Receive message from WebSocket"""
+        user = self.scope.get('user')
+        if await self.is_rate_limited(user.id):
+            await self.send_payload({
+                'type': 'error',
+                'message': 'You are sending messages too fast'
+            })
+            return
+        
         try:
-            data = json.loads(text_data)
+            data = self.decode_payload(text_data, bytes_data)
             message = data.get('message', '')
-            user = self.scope.get('user')
             
             if not message.strip():
                 return
             
+            # Re-check membership; served from the cache while it is warm
+            if not await self.check_group_membership(user.id, self.group_id):
+                await self.send_payload({
+                    'type': 'error',
+                    'message': 'You are not a member of this group'
+                })
+                await self.close()
+                return
+            
             # Save message to database
             chat_message = await self.save_message(user.id, self.group_id, message)
             
+            # Encode once here rather than once per receiving socket
+            frames = self.encode_payload({
+                'type': 'message',
+                'message': {
+                    'id': chat_message['id'],
+                    'user_id': user.id,
+                    'username': self.username,
+                    'message': message,
+                    'timestamp': chat_message['timestamp']
+                }
+            })
+            
             # Send message to room group
             await self.channel_layer.group_send(
                 self.room_group_name,
                 {
                     'type': 'chat_message',
-                    'message': {
-                        'id': chat_message['id'],
-                        'user_id': user.id,
-                        'username': user.get_full_name(),
-                        'message': message,
-                        'timestamp': chat_message['timestamp']
-                    }
+                    'frames': frames
                 }
             )
             
-        except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({
+        except (ValueError, msgpack.UnpackException):
+            await self.send_payload({
                 'type': 'error',
-                'message': 'Invalid JSON'
-            }))
+                'message': 'Invalid message format'
+            })
     
     async def chat_message(self, event):
         """Receive message from room group"""
         # Send message to WebSocket
-        await self.send(text_data=json.dumps({
-            'type': 'message',
-            'message': event['message']
-        }))
+        await self.send_encoded(event['frames'])
     
     async def user_joined(self, event):
         """User joined notification"""
-        await self.send(text_data=json.dumps({
+        await self.send_payload({
             'type': 'user_joined',
             'user_id': event['user_id'],
             'username': event['username']
-        }))
+        })
     
     async def user_left(self, event):
         """User left notification"""
-        await self.send(text_data=json.dumps({
+        await self.send_payload({
             'type': 'user_left',
             'user_id': event['user_id'],
             'username': event['username']
-        }))
+        })
     
-    @database_sync_to_async
-    def check_group_membership(self, user_id, group_id):
-        """Check if user is member of group"""
-        from community.models import GroupMember
+    async def is_rate_limited(self, user_id):
+        """Count this message in the user's one-second window"""
+        key = f'rl:chat:{user_id}:{int(time.time())}'
+        await cache.aadd(key, 0, 2)
+        # The base aincr() is a get then a set, which races and resets the TTL;
+        # django_redis's incr() is a single INCR that keeps it
         try:
-            return GroupMember.objects.filter(
-                user_id=user_id,
-                group_id=group_id,
-                is_active=True
-            ).exists()
-        except:
+            count = await sync_to_async(cache.incr, thread_sensitive=False)(key)
+        except ValueError:
+            # The window expired between the add and the increment
             return False
+        return count > self.RATE_LIMIT
     
-    @database_sync_to_async
-    def save_message(self, user_id, group_id, message):
-        """Save chat message to database"""
-        from community.models import ChatMessage
-        from django.utils import timezone
+    async def check_group_membership(self, user_id, group_id):
+        """Check if user is member of group"""
+        key = membership_cache_key(group_id, user_id)
+        if await cache.aget(key):
+            return True
+        try:
+            is_member = await db.fetchval(MEMBERSHIP_SQL, group_id, user_id) is not None
+        except db.DB_ERRORS:
+            # Fail closed, but leave a trace instead of hiding the outage
+            logger.exception("Group membership check failed")
+            return False
         
-        chat_message = ChatMessage.objects.create(
+        if is_member:
+            await cache.aset(key, True, MEMBERSHIP_CACHE_TIMEOUT)
+        return is_member
+    
+    async def save_message(self, user_id, group_id, message):
+        """Queue chat message for the next bulk write"""
+        # Stamped now, so the stored created_at matches the timestamp clients see
+        chat_message = ChatMessage(
             group_id=group_id,
             sender_id=user_id,
-            message=message
+            message=message,
+            created_at=timezone.now()
         )
+        chat_message_writer.put(chat_message)
         
+        # The uuid is the message id clients see; the row id comes later
         return {
-            'id': chat_message.id,
+            'id': str(chat_message.uuid),
             'timestamp': chat_message.created_at.isoformat()
         }
 
 
-class EventUpdateConsumer(AsyncWebsocketConsumer):
+class EventUpdateConsumer(FramedConsumer):
     """
     Consumer for live event updates
     Real-time RSVP counts, attendance updates
@@ -263,10 +439,10 @@ class EventUpdateConsumer(AsyncWebsocketConsumer):
         
         # Send current event stats
         stats = await self.get_event_stats(self.event_id)
-        await self.send(text_data=json.dumps({
+        await self.send_payload({
             'type': 'event_stats',
             'stats': stats
-        }))
+        })
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection"""
@@ -279,22 +455,23 @@ class EventUpdateConsumer(AsyncWebsocketConsumer):
     async def event_update(self, event):
         """Receive event update from room group"""
         # Send update to WebSocket
-        await self.send(text_data=json.dumps({
+        await self.send_payload({
             'type': 'update',
             'update': event['update']
-        }))
+        })
     
-    @database_sync_to_async
-    def get_event_stats(self, event_id):
+    async def get_event_stats(self, event_id):
         """Get current event statistics"""
-        from events.models import Event
-        try:
-            event = Event.objects.get(id=event_id)
-            return {
-                'total_rsvps': event.total_rsvps,
-                'total_checked_in': event.total_checked_in,
-                'spots_remaining': event.spots_remaining,
-                'is_full': event.is_full
-            }
-        except Event.DoesNotExist:
-            return {}
\ No newline at end of file
+        row = await db.fetchrow(EVENT_STATS_SQL, event_id, RSVP.RSVPStatus.GOING.value)
+        if row is None:
+            return {}
+        
+        total_rsvps = row['total_rsvps']
+        total_checked_in = row['total_checked_in']
+        max_attendees = row['max_attendees']
+        return {
+            'total_rsvps': total_rsvps,
+            'total_checked_in': total_checked_in,
+            'spots_remaining': max(0, max_attendees - total_rsvps) if max_attendees else None,
+            'is_full': total_rsvps >= max_attendees if max_attendees else False
+        }
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Async PostgreSQL Access
+A native asyncpg pool for hot read-only WebSocket queries
+"""
+
+import asyncio
+import weakref
+
+import asyncpg
+from django.conf import settings
+
+POOL_MIN_SIZE = 5
+POOL_MAX_SIZE = 50
+POOL_MAX_INACTIVE_LIFETIME = 600
+
+# What a pooled query raises when the database is unreachable or rejects it
+DB_ERRORS = (OSError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+# One pool per event loop; the value is the task creating it, so concurrent
+# first callers share a single pool instead of racing to build several
+_pools = weakref.WeakKeyDictionary()
+
+
+async def _create_pool():
+    db = settings.DATABASES['default']
+    return await asyncpg.create_pool(
+        host=db['HOST'] or None,
+        port=int(db['PORT']) if db['PORT'] else None,
+        user=db['USER'],
+        password=db['PASSWORD'],
+        database=db['NAME'],
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        max_inactive_connection_lifetime=POOL_MAX_INACTIVE_LIFETIME,
+    )
+
+
+async def get_pool():
+    """Return the pool for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    task = _pools.get(loop)
+    if task is None or (task.done() and task.exception() is not None):
+        task = _pools[loop] = loop.create_task(_create_pool())
+    return await asyncio.shield(task)
+
+
+async def fetchval(query, *args):
+    """Run a query on a pooled connection and return the first column of the first row"""
+    pool = await get_pool()
+    async with pool.acquire() as connection:
+        return await connection.fetchval(query, *args)
+
+
+async def fetchrow(query, *args):
+    """Run a query on a pooled connection and return the first row"""
+    pool = await get_pool()
+    async with pool.acquire() as connection:
+        return await connection.fetchrow(query, *args)
@@ -0,0 +1,44 @@
+"""
+Channels Middleware
+WebSocket authentication with a short-lived user cache
+"""
+
+import hashlib
+
+from channels.auth import AuthMiddleware
+from channels.sessions import CookieMiddleware, SessionMiddleware
+from django.conf import settings
+from django.core.cache import cache
+
+# Seconds an authenticated user is reused across sockets of the same session
+WS_AUTH_CACHE_TIMEOUT = 300
+
+
+class CachedAuthMiddleware(AuthMiddleware):
+    """
+    AuthMiddleware that caches the resolved user per session
+    Several sockets opened by the same browser session (notifications,
+    chat, events) share one user lookup instead of hitting the DB each time.
+    A logout is picked up once the cache entry expires.
+    """
+    
+    async def resolve_scope(self, scope):
+        session_key = scope.get('cookies', {}).get(settings.SESSION_COOKIE_NAME)
+        if not session_key:
+            return await super().resolve_scope(scope)
+        
+        cache_key = f"ws:session:{hashlib.sha256(session_key.encode()).hexdigest()}"
+        user = await cache.aget(cache_key)
+        if user is not None:
+            scope['user']._wrapped = user
+            return
+        
+        await super().resolve_scope(scope)
+        user = scope['user']._wrapped
+        if user.is_authenticated:
+            await cache.aset(cache_key, user, timeout=WS_AUTH_CACHE_TIMEOUT)
+
+
+def CachedAuthMiddlewareStack(inner):
+    """Drop-in replacement for channels' AuthMiddlewareStack"""
+    return CookieMiddleware(SessionMiddleware(CachedAuthMiddleware(inner)))
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""
+Shared Serializer Helpers
+Opt-in expansion of nested objects with ?expand=
+"""
+
+
+def expanded_fields(request):
+    """Names requested with ?expand=a,b on this request"""
+    if request is None:
+        return set()
+    return {name for name in request.query_params.get('expand', '').split(',') if name}
+
+
+class ExpandableSerializerMixin:
+    """
+    Embeds nested serializers only when the client asks for them
+    Subclasses declare Meta.expandable_fields = {name: (serializer_class, source)};
+    by default only the related id is rendered
+    """
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = expanded_fields(self.context.get('request'))
+        for name, (serializer_class, source) in self.Meta.expandable_fields.items():
+            if name in requested:
+                fields[name] = serializer_class(source=source, read_only=True)
+        return fields
@@ -2,15 +2,98 @@
 Common Background Tasks
 """
 
-from celery import shared_task
-from django.core.mail import send_mail
+from asgiref.sync import async_to_sync
+from celery import shared_task, group
+from celery.signals import worker_process_shutdown, worker_shutdown
+from channels.layers import get_channel_layer
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
+from smtplib import SMTPException, SMTPServerDisconnected
 import logging
+import os
+import queue
+
+from authentication.models import User
+from common.consumers import notification_channel_key
+from denomination.models import ChurchBranch
+from events.models import Event
 
 logger = logging.getLogger(__name__)
 
+# Open SMTP connections kept by this worker process, reused across tasks
+_email_connections = queue.LifoQueue()
+_email_connections_pid = os.getpid()
+
+
+def _connection_pool():
+    """Return this process's connection pool, starting a fresh one after a fork"""
+    global _email_connections, _email_connections_pid
+    if _email_connections_pid != os.getpid():
+        _email_connections = queue.LifoQueue()
+        _email_connections_pid = os.getpid()
+    return _email_connections
+
+
+def send_pooled_messages(messages):
+    """
+    Send email messages over a pooled SMTP connection
+    Reconnects once if the server dropped an idle connection; a connection
+    that fails any other way is closed instead of going back to the pool
+    """
+    pool = _connection_pool()
+    try:
+        connection = pool.get_nowait()
+    except queue.Empty:
+        connection = get_connection()
+        connection.open()
+    
+    try:
+        try:
+            sent = connection.send_messages(messages)
+        except SMTPServerDisconnected:
+            connection.close()
+            connection.open()
+            sent = connection.send_messages(messages)
+    except Exception:
+        connection.close()
+        raise
+    
+    pool.put(connection)
+    return sent
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def close_email_connections(**kwargs):
+    """Close pooled SMTP connections when the worker stops"""
+    pool = _connection_pool()
+    while True:
+        try:
+            pool.get_nowait().close()
+        except queue.Empty:
+            break
+        except Exception:
+            pass
+
+
+def _build_message(subject, message, recipient_list, html_message=None):
+    """Build a message with an optional HTML alternative, like send_mail"""
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=recipient_list
+    )
+    if html_message:
+        email.attach_alternative(html_message, 'text/html')
+    return email
+
 
 @shared_task(name='send_email_task')
 def send_email_task(subject, message, recipient_list, html_message=None):
@@ -18,14 +101,7 @@ def send_email_task(subject, message, recipient_list, html_message=None):
     Send email asynchronously
     """
     try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=recipient_list,
-            html_message=html_message,
-            fail_silently=False,
-        )
+        send_pooled_messages([_build_message(subject, message, recipient_list, html_message)])
         logger.info(f"Email sent successfully to {recipient_list}")
         return True
     except Exception as e:
@@ -33,62 +109,82 @@ def send_email_task(subject, message, recipient_list, html_message=None):
         return False
 
 
+@shared_task(
+    name='send_email_batch_task',
+    acks_late=True,
+    autoretry_for=(SMTPException,),
+    retry_backoff=True,
+    max_retries=3
+)
+def send_email_batch_task(subject, message, recipient_list, html_message=None):
+    """
+    Send one batch of a bulk email, retrying on SMTP errors
+    Each recipient gets their own message, all over one SMTP session
+    """
+    sent = send_pooled_messages([
+        _build_message(subject, message, [recipient], html_message)
+        for recipient in recipient_list
+    ])
+    logger.info(f"Sent batch of {sent} emails")
+    return sent
+
+
 @shared_task(name='send_bulk_email_task')
 def send_bulk_email_task(subject, message, recipient_list, html_message=None):
     """
-    Send bulk emails in batches
+    Send bulk emails in batches, one subtask per batch so workers send in parallel
     """
     batch_size = 50
-    total_sent = 0
-    
-    for i in range(0, len(recipient_list), batch_size):
-        batch = recipient_list[i:i + batch_size]
-        try:
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=batch,
-                html_message=html_message,
-                fail_silently=False,
-            )
-            total_sent += len(batch)
-            logger.info(f"Sent batch {i//batch_size + 1}: {len(batch)} emails")
-        except Exception as e:
-            logger.error(f"Failed to send batch {i//batch_size + 1}: {str(e)}")
+    batches = group(
+        send_email_batch_task.s(subject, message, recipient_list[i:i + batch_size], html_message)
+        for i in range(0, len(recipient_list), batch_size)
+    )
+    batches.apply_async()
     
-    logger.info(f"Bulk email complete: {total_sent}/{len(recipient_list)} sent")
-    return total_sent
+    logger.info(f"Bulk email queued: {len(batches)} batches for {len(recipient_list)} recipients")
+    return len(batches)
 
 
-@shared_task(name='generate_daily_reports')
+def _branch_count_for_day(model, date_field, day):
+    """Subquery counting a branch's rows of model whose date_field falls on day"""
+    counts = model.objects.filter(
+        church_branch=OuterRef('pk'), **{f'{date_field}__date': day}
+    ).order_by().values('church_branch').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+@shared_task(name='generate_daily_reports', acks_late=True)
 def generate_daily_reports():
     """
     Generate daily reports for all churches
     """
-    from denomination.models import ChurchBranch
-    from django.db.models import Count
-    
     logger.info("Starting daily report generation")
     
     try:
-        branches = ChurchBranch.objects.filter(status='active')
+        yesterday = (timezone.now() - timedelta(days=1)).date()
+        
+        # One query for every branch; each count is a correlated subquery so
+        # users and events are never joined against each other
+        branches = ChurchBranch.objects.filter(status='active').annotate(
+            new_members=_branch_count_for_day(User, 'created_at', yesterday),
+            event_count=_branch_count_for_day(Event, 'start_datetime', yesterday),
+        ).order_by().values('id', 'name', 'new_members', 'event_count')
         
+        total = 0
         for branch in branches:
             # Generate report data
-            yesterday = timezone.now() - timedelta(days=1)
-            
             report_data = {
-                'date': yesterday.date(),
-                'branch': branch.name,
-                'new_members': branch.users.filter(created_at__date=yesterday.date()).count(),
-                'events': branch.events.filter(start_datetime__date=yesterday.date()).count(),
+                'date': yesterday,
+                'branch': branch['name'],
+                'new_members': branch['new_members'],
+                'events': branch['event_count'],
                 # Add more metrics as needed
             }
             
-            logger.info(f"Generated report for {branch.name}")
+            total += 1
+            logger.info(f"Generated report for {branch['name']}")
         
-        return f"Reports generated for {branches.count()} branches"
+        return f"Reports generated for {total} branches"
     
     except Exception as e:
         logger.error(f"Failed to generate reports: {str(e)}")
@@ -100,11 +196,10 @@ def cleanup_expired_sessions():
     """
     Clean up expired sessions
     """
-    from django.core.management import call_command
-    
     try:
-        call_command('clearsessions')
-        logger.info("Expired sessions cleaned up")
+        # Session has no dependents, so this is a single DELETE statement
+        deleted, _ = Session.objects.filter(expire_date__lt=timezone.now()).delete()
+        logger.info(f"Expired sessions cleaned up: {deleted}")
         return "Success"
     except Exception as e:
         logger.error(f"Failed to cleanup sessions: {str(e)}")
@@ -116,13 +211,15 @@ def send_websocket_notification(user_id, notification_data):
     """
     Send notification via WebSocket
     """
-    from channels.layers import get_channel_layer
-    from asgiref.sync import async_to_sync
-    
     try:
+        channel_name = cache.get(notification_channel_key(user_id))
+        if not channel_name:
+            logger.info(f"User {user_id} has no open notification socket")
+            return False
+        
         channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'notifications_{user_id}',
+        async_to_sync(channel_layer.send)(
+            channel_name,
             {
                 'type': 'notification_message',
                 'notification': notification_data
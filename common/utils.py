@@ -0,0 +1,9 @@
+"""
+Shared Utilities
+"""
+
+
+def is_changelist(request):
+    """Check if the admin request is rendering a changelist page"""
+    match = request.resolver_match
+    return bool(match and match.url_name and match.url_name.endswith('_changelist'))
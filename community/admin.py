@@ -1,6 +1,8 @@
 # community/admin.py
 from django.contrib import admin
+from django.db.models.functions import Substr
 from django.utils.translation import gettext_lazy as _
+from common.utils import is_changelist
 from .models import Group, GroupMember, Post, Reaction, Comment, ChatMessage
 
 
@@ -147,11 +149,15 @@ class ChatMessageAdmin(admin.ModelAdmin):
     raw_id_fields = ['group', 'sender']
 
     def message_preview(self, obj):
-        return obj.message[:50] + "..." if len(obj.message) > 50 else obj.message
+        # preview holds one character more than shown so we know to add "..."
+        return obj.preview[:50] + "..." if len(obj.preview) > 50 else obj.preview
     message_preview.short_description = _("Message")
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
+        if is_changelist(request):
+            # Rows only show the preview, so leave the full text in the database
+            qs = qs.annotate(preview=Substr('message', 1, 51)).defer('message')
         user = request.user
         if user.is_super_admin():
             return qs
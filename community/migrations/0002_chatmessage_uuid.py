@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-16 04:23
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatmessage',
+            name='uuid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, null=True, verbose_name='uuid'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 04:23
+
+from django.db import migrations
+import uuid
+
+
+def gen_uuid(apps, schema_editor):
+    ChatMessage = apps.get_model('community', 'ChatMessage')
+    for row in ChatMessage.objects.filter(uuid__isnull=True).only('id').iterator():
+        row.uuid = uuid.uuid4()
+        row.save(update_fields=['uuid'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0002_chatmessage_uuid'),
+    ]
+
+    operations = [
+        migrations.RunPython(gen_uuid, reverse_code=migrations.RunPython.noop),
+    ]
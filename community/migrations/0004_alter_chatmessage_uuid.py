@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-16 04:23
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0003_populate_chatmessage_uuid'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatmessage',
+            name='uuid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='uuid'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-16 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("community", "0004_alter_chatmessage_uuid"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["group", "created_at"], name="community_c_group_i_0d8843_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["group", "-created_at"], name="community_p_group_i_e114d3_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 04:47
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("community", "0005_feed_and_chat_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="chatmessage",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+                verbose_name="created at",
+            ),
+        ),
+    ]
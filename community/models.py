@@ -1,10 +1,40 @@
 # community/models.py
-from django.db import models
+import uuid
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django_redis import get_redis_connection
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from authentication.models import User
 from denomination.models import ChurchBranch
 
 
+class GroupQuerySet(models.QuerySet):
+    """QuerySet helpers for groups"""
+
+    def with_counts(self):
+        """Annotate member_count in the same query"""
+        return self.annotate(member_count=Count('members'))
+
+    def visible_to(self, user):
+        """Groups the user may view; the queryset form of can_view_group"""
+        visibility = self.model.Visibility
+        public = Q(visibility=visibility.PUBLIC)
+        if not user.is_authenticated:
+            return self.filter(public)
+        # Exists rather than a join so member_count annotations stay correct
+        is_member = Exists(GroupMember.objects.filter(group=OuterRef('pk'), user=user))
+        return self.filter(
+            public | (
+                Q(church_branch_id=user.church_branch_id) &
+                (~Q(visibility=visibility.SECRET) | is_member)
+            )
+        )
+
+
 class Group(models.Model):
     """
     Church community groups (e.g., Youth, Prayer Warriors)
@@ -43,6 +73,8 @@ class Group(models.Model):
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
 
+    objects = GroupQuerySet.as_manager()
+
     class Meta:
         db_table = 'community_groups'
         verbose_name = _('group')
@@ -93,6 +125,85 @@ class GroupMember(models.Model):
         return f"{self.user.get_full_name()} in {self.group.name}"
 
 
+# How long a confirmed chat membership is trusted without a DB check
+MEMBERSHIP_CACHE_TIMEOUT = 60 * 60
+
+
+def membership_cache_key(group_id, user_id):
+    """Cache key marking a user as a member of a group"""
+    return f'member:{group_id}:{user_id}'
+
+
+# How long a group's cached member and admin id sets live
+GROUP_MEMBERS_CACHE_TIMEOUT = 60 * 60
+
+# Roles that can manage a group
+GROUP_ADMIN_ROLES = (GroupMember.Role.ADMIN, GroupMember.Role.MODERATOR)
+
+# Stored in every cached set so a loaded group with no admins still exists
+_LOADED_MARKER = 0
+
+
+def group_member_set_keys(group_id):
+    """Redis keys of the member and admin user id sets for a group"""
+    return (
+        cache.make_key(f'group:{group_id}:members'),
+        cache.make_key(f'group:{group_id}:admins')
+    )
+
+
+def is_cached_group_member(group_id, user_id, admin=False):
+    """
+    Check membership (or admin/moderator role) against the cached id sets
+    On a miss both sets are loaded from the database in one query
+    """
+    members_key, admins_key = group_member_set_keys(group_id)
+    key = admins_key if admin else members_key
+    redis = get_redis_connection('default')
+    
+    pipe = redis.pipeline(transaction=False)
+    pipe.sismember(key, user_id)
+    pipe.exists(key)
+    found, loaded = pipe.execute()
+    if loaded:
+        return bool(found)
+    
+    rows = GroupMember.objects.filter(group_id=group_id).values_list('user_id', 'role')
+    members = [member_id for member_id, _ in rows]
+    admins = [member_id for member_id, role in rows if role in GROUP_ADMIN_ROLES]
+    
+    pipe = redis.pipeline()
+    pipe.delete(members_key, admins_key)
+    pipe.sadd(members_key, _LOADED_MARKER, *members)
+    pipe.sadd(admins_key, _LOADED_MARKER, *admins)
+    pipe.expire(members_key, GROUP_MEMBERS_CACHE_TIMEOUT)
+    pipe.expire(admins_key, GROUP_MEMBERS_CACHE_TIMEOUT)
+    pipe.execute()
+    return user_id in (admins if admin else members)
+
+
+@receiver(post_save, sender=GroupMember)
+@receiver(post_delete, sender=GroupMember)
+def invalidate_membership_cache(sender, instance, **kwargs):
+    """Forget cached memberships when a member joins, changes role or leaves"""
+    cache.delete(membership_cache_key(instance.group_id, instance.user_id))
+    
+    # Wait for the commit so a concurrent reload can't cache the old rows
+    keys = group_member_set_keys(instance.group_id)
+    transaction.on_commit(lambda: get_redis_connection('default').delete(*keys))
+
+
+class PostQuerySet(models.QuerySet):
+    """QuerySet helpers for posts"""
+
+    def with_counts(self):
+        """Annotate reaction_count and comment_count in the same query"""
+        return self.annotate(
+            reaction_count=Count('reactions', distinct=True),
+            comment_count=Count('comments', distinct=True)
+        )
+
+
 class Post(models.Model):
     """
     Posts within a group
@@ -119,11 +230,16 @@ class Post(models.Model):
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         db_table = 'community_posts'
         verbose_name = _('post')
         verbose_name_plural = _('posts')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['group', '-created_at']),
+        ]
 
     def __str__(self):
         return f"Post by {self.author.get_full_name()} in {self.group.name}"
@@ -214,6 +330,13 @@ class ChatMessage(models.Model):
         related_name='sent_chat_messages',
         verbose_name=_('sender')
     )
+    # Assigned before the row is written so live clients can reference it
+    uuid = models.UUIDField(
+        _('uuid'),
+        default=uuid.uuid4,
+        editable=False,
+        unique=True
+    )
     message = models.TextField(_('message'))
     attachment = models.FileField(
         _('attachment'),
@@ -221,13 +344,17 @@ class ChatMessage(models.Model):
         blank=True,
         null=True
     )
-    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    # Not auto_now_add: the consumer stamps it on arrival, before the bulk write
+    created_at = models.DateTimeField(_('created at'), default=timezone.now, editable=False)
 
     class Meta:
         db_table = 'community_chat_messages'
         verbose_name = _('chat message')
         verbose_name_plural = _('chat messages')
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['group', 'created_at']),
+        ]
 
     def __str__(self):
         return f"Message by {self.sender.get_full_name()} in {self.group.name}"
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""
+Pagination classes for community endpoints
+"""
+
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class StandardPagination(PageNumberPagination):
+    """Page-numbered listing with a client-adjustable page size"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PostCursorPagination(CursorPagination):
+    """
+    Keyset pagination for group feeds
+    No COUNT(*) and each page is a range scan on (group, -created_at)
+    """
+    ordering = '-created_at'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -1,13 +1,22 @@
 # community/permissions.py
 from rest_framework import permissions
+from .models import is_cached_group_member
+
+def _memoized(user, attr, group, check):
+    """Run check once per (user, group); the user object lives for one request"""
+    results = user.__dict__.setdefault(attr, {})
+    if group.pk not in results:
+        results[group.pk] = check(user, group)
+    return results[group.pk]
 
 def is_group_admin(user, group):
     """Check if user is admin/mod in the group"""
-    try:
-        membership = group.members.get(user=user)
-        return membership.role in ['admin', 'moderator']
-    except:
+    if not user.is_authenticated:
         return False
+    return _memoized(user, '_group_admin_cache', group, _is_group_admin)
+
+def _is_group_admin(user, group):
+    return is_cached_group_member(group.id, user.id, admin=True)
 
 def can_view_group(user, group):
     """Check if user can view the group based on visibility"""
@@ -15,8 +24,11 @@ def can_view_group(user, group):
         return True
     if not user.is_authenticated:
         return False
-    if user.church_branch != group.church_branch:
+    return _memoized(user, '_group_view_cache', group, _can_view_group)
+
+def _can_view_group(user, group):
+    if user.church_branch_id != group.church_branch_id:
         return False
     if group.visibility == 'secret':
-        return group.members.filter(user=user).exists()
+        return is_cached_group_member(group.id, user.id)
     return True
\ No newline at end of file
@@ -1,31 +1,67 @@
 # community/serializers.py
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Group, GroupMember, Post, Reaction, Comment, ChatMessage
+from authentication.models import UserProfile
 from authentication.serializers import UserSerializer
+from common.serializers import ExpandableSerializerMixin, expanded_fields
 
+# User columns rendered by the nested UserSerializer
+_USER_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'phone_number',
+    'profile_image', 'role', 'is_verified', 'is_active', 'created_at'
+)
 
-class GroupMemberSerializer(serializers.ModelSerializer):
-    user_detail = UserSerializer(source='user', read_only=True)
 
+def _profiles_with_age(lookup):
+    """Prefetch the nested user profiles with age computed by the database"""
+    return Prefetch(lookup, queryset=UserProfile.objects.with_age())
+
+
+class GroupMemberSerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = GroupMember
-        fields = ['id', 'user', 'user_detail', 'role', 'joined_at']
+        fields = ['id', 'user', 'role', 'joined_at']
         read_only_fields = ['id', 'joined_at']
+        expandable_fields = {'user_detail': (UserSerializer, 'user')}
 
 
-class GroupSerializer(serializers.ModelSerializer):
-    created_by_detail = UserSerializer(source='created_by', read_only=True)
+class GroupSerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
     members = GroupMemberSerializer(many=True, read_only=True)
-    member_count = serializers.ReadOnlyField()
+    # Annotated by Group.objects.with_counts()
+    member_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Group
         fields = [
             'id', 'name', 'description', 'cover_image', 'visibility',
-            'created_by', 'created_by_detail', 'church_branch',
+            'created_by', 'church_branch',
             'member_count', 'members', 'created_at'
         ]
         read_only_fields = ['id', 'created_by', 'created_at']
+        expandable_fields = {'created_by_detail': (UserSerializer, 'created_by')}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, request=None):
+        """Load members, and any expanded users, in a fixed number of queries; views must apply this"""
+        expand = expanded_fields(request)
+        
+        members = GroupMember.objects.all()
+        member_fields = ['id', 'group', 'user', 'role', 'joined_at']
+        if 'user_detail' in expand:
+            members = members.select_related('user').prefetch_related(
+                _profiles_with_age('user__profile')
+            )
+            member_fields += [f'user__{field}' for field in _USER_FIELDS]
+        queryset = queryset.prefetch_related(
+            Prefetch('members', queryset=members.only(*member_fields))
+        )
+        
+        if 'created_by_detail' in expand:
+            queryset = queryset.select_related('created_by').prefetch_related(
+                _profiles_with_age('created_by__profile')
+            )
+        return queryset
 
 
 class GroupCreateUpdateSerializer(serializers.ModelSerializer):
@@ -41,45 +77,49 @@ class GroupCreateUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
-class PostSerializer(serializers.ModelSerializer):
-    author_detail = UserSerializer(source='author', read_only=True)
-    reaction_count = serializers.SerializerMethodField()
-    comment_count = serializers.ReadOnlyField()
+class PostSerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
+    # Annotated by Post.objects.with_counts()
+    reaction_count = serializers.IntegerField(read_only=True)
+    comment_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Post
         fields = [
-            'id', 'group', 'author', 'author_detail', 'content',
+            'id', 'group', 'author', 'content',
             'media', 'reaction_count', 'comment_count', 'created_at'
         ]
         read_only_fields = ['id', 'author', 'created_at']
+        expandable_fields = {'author_detail': (UserSerializer, 'author')}
 
-    def get_reaction_count(self, obj):
-        return obj.reactions.count()
-
+    @classmethod
+    def setup_eager_loading(cls, queryset, request=None):
+        """Join the author only when it is expanded; views must apply this"""
+        if 'author_detail' in expanded_fields(request):
+            queryset = queryset.select_related('author').prefetch_related(
+                _profiles_with_age('author__profile')
+            )
+        return queryset
 
-class ReactionSerializer(serializers.ModelSerializer):
-    user_detail = UserSerializer(source='user', read_only=True)
 
+class ReactionSerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Reaction
-        fields = ['id', 'post', 'user', 'user_detail', 'type', 'created_at']
+        fields = ['id', 'post', 'user', 'type', 'created_at']
         read_only_fields = ['id', 'user', 'created_at']
+        expandable_fields = {'user_detail': (UserSerializer, 'user')}
 
 
-class CommentSerializer(serializers.ModelSerializer):
-    user_detail = UserSerializer(source='user', read_only=True)
-
+class CommentSerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
-        fields = ['id', 'post', 'user', 'user_detail', 'content', 'created_at']
+        fields = ['id', 'post', 'user', 'content', 'created_at']
         read_only_fields = ['id', 'user', 'created_at']
+        expandable_fields = {'user_detail': (UserSerializer, 'user')}
 
 
-class ChatMessageSerializer(serializers.ModelSerializer):
-    sender_detail = UserSerializer(source='sender', read_only=True)
-
+class ChatMessageSerializer(ExpandableSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ChatMessage
-        fields = ['id', 'group', 'sender', 'sender_detail', 'message', 'attachment', 'created_at']
-        read_only_fields = ['id', 'sender', 'created_at']
\ No newline at end of file
+        fields = ['id', 'uuid', 'group', 'sender', 'message', 'attachment', 'created_at']
+        read_only_fields = ['id', 'uuid', 'sender', 'created_at']
+        expandable_fields = {'sender_detail': (UserSerializer, 'sender')}
\ No newline at end of file
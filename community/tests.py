@@ -1,3 +1,72 @@
+from django.contrib.auth.models import AnonymousUser
 from django.test import TestCase
 
-# Create your tests here.
+from authentication.models import User
+from denomination.models import ChurchBranch, Denomination
+from .models import Group, GroupMember
+
+
+class GroupVisibilityTests(TestCase):
+    """Group.objects.visible_to() mirrors can_view_group"""
+
+    @classmethod
+    def setUpTestData(cls):
+        denomination = Denomination.objects.create(name='Grace Fellowship')
+        branch = cls.make_branch(denomination, 'Ikeja')
+        other_branch = cls.make_branch(denomination, 'Lekki')
+
+        cls.member = cls.make_user('member', branch)
+        cls.non_member = cls.make_user('nonmember', branch)
+        cls.outsider = cls.make_user('outsider', other_branch)
+
+        cls.public = cls.make_group('Public', Group.Visibility.PUBLIC, branch)
+        cls.private = cls.make_group('Private', Group.Visibility.PRIVATE, branch)
+        cls.secret = cls.make_group('Secret', Group.Visibility.SECRET, branch)
+        for group in (cls.private, cls.secret):
+            GroupMember.objects.create(group=group, user=cls.member)
+
+    @staticmethod
+    def make_branch(denomination, name):
+        return ChurchBranch.objects.create(
+            denomination=denomination,
+            name=name,
+            address='1 Church Road',
+            city=name,
+            state='Lagos',
+            contact_email=f'{name.lower()}@example.com',
+            contact_phone='08000000000',
+        )
+
+    @staticmethod
+    def make_user(username, branch):
+        return User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='Str0ng-Passw0rd!',
+            church_branch=branch,
+        )
+
+    @classmethod
+    def make_group(cls, name, visibility, branch):
+        return Group.objects.create(
+            name=name, visibility=visibility, church_branch=branch, created_by=cls.member
+        )
+
+    def visible(self, user):
+        return set(Group.objects.visible_to(user))
+
+    def test_member_sees_private_and_secret_groups(self):
+        self.assertEqual(self.visible(self.member), {self.public, self.private, self.secret})
+
+    def test_non_member_in_branch_sees_private_but_not_secret(self):
+        self.assertEqual(self.visible(self.non_member), {self.public, self.private})
+
+    def test_other_branch_sees_only_public(self):
+        self.assertEqual(self.visible(self.outsider), {self.public})
+
+    def test_anonymous_sees_only_public(self):
+        self.assertEqual(self.visible(AnonymousUser()), {self.public})
+
+    def test_member_count_is_not_inflated_by_membership_check(self):
+        group = Group.objects.visible_to(self.member).with_counts().get(pk=self.secret.pk)
+        self.assertEqual(group.member_count, 1)
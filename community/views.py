@@ -12,10 +12,12 @@ from .serializers import (
     PostSerializer, ReactionSerializer, CommentSerializer, ChatMessageSerializer
 )
 from .permissions import can_view_group, is_group_admin
+from .pagination import StandardPagination, PostCursorPagination
 
 
 class GroupListView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardPagination
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -24,11 +26,11 @@ class GroupListView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        # Only show groups in user's church branch
-        groups = Group.objects.filter(church_branch=user.church_branch)
-        # Filter by visibility
-        visible_groups = [g for g in groups if can_view_group(user, g)]
-        return visible_groups
+        # Only show groups in user's church branch that they may view
+        return GroupSerializer.setup_eager_loading(
+            Group.objects.filter(church_branch=user.church_branch).visible_to(user).with_counts(),
+            self.request
+        )
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -36,11 +38,16 @@ class GroupListView(generics.ListCreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        # Auto-add creator as admin
-        group = serializer.instance
-        GroupMember.objects.create(group=group, user=request.user, role='admin')
-        response_serializer = GroupSerializer(group)
+        with transaction.atomic():
+            self.perform_create(serializer)
+            # Auto-add creator as admin
+            group = serializer.instance
+            # create() rather than bulk_create() so post_save clears the membership caches
+            GroupMember.objects.create(group=group, user=request.user, role='admin')
+        response_serializer = GroupSerializer(
+            GroupSerializer.setup_eager_loading(Group.objects.with_counts(), request).get(pk=group.pk),
+            context=self.get_serializer_context()
+        )
         return Response({
             'success': True,
             'message': 'Group created successfully!',
@@ -49,10 +56,15 @@ class GroupListView(generics.ListCreateAPIView):
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
         serializer = self.get_serializer(queryset, many=True)
         return Response({
             'success': True,
-            'count': len(queryset),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -70,7 +82,11 @@ class GroupDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Group.objects.all()
 
     def get_object(self):
-        obj = get_object_or_404(Group, id=self.kwargs['id'])
+        queryset = Group.objects.with_counts()
+        if self.request.method == 'GET':
+            # Only the read response renders the nested members
+            queryset = GroupSerializer.setup_eager_loading(queryset, self.request)
+        obj = get_object_or_404(queryset, id=self.kwargs['id'])
         if not can_view_group(self.request.user, obj):
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You don't have permission to view this group.")
@@ -97,23 +113,33 @@ class GroupDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 class GroupPostListView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = PostCursorPagination
 
     def get_serializer_class(self):
         return PostSerializer
 
+    def _get_group(self):
+        """Resolve the group and the viewer's access to it once per request"""
+        if not hasattr(self, '_group'):
+            self._group = get_object_or_404(Group, id=self.kwargs['group_id'])
+            self._can_view_group = can_view_group(self.request.user, self._group)
+        return self._group
+
     def get_queryset(self):
-        group_id = self.kwargs['group_id']
-        group = get_object_or_404(Group, id=group_id)
-        if not can_view_group(self.request.user, group):
+        group = self._get_group()
+        if not self._can_view_group:
             return Post.objects.none()
-        return Post.objects.filter(group=group)
+        return PostSerializer.setup_eager_loading(
+            Post.objects.filter(group=group).with_counts(), self.request
+        )
 
     def perform_create(self, serializer):
-        group_id = self.kwargs['group_id']
-        group = get_object_or_404(Group, id=group_id)
-        if not can_view_group(self.request.user, group):
+        group = self._get_group()
+        if not self._can_view_group:
             raise serializers.ValidationError("You cannot post in this group.")
-        serializer.save(author=self.request.user, group=group)
+        post = serializer.save(author=self.request.user, group=group)
+        # A new post has nothing to count yet
+        post.reaction_count = post.comment_count = 0
 
     def create(self, request, group_id):
         serializer = self.get_serializer(data=request.data)
@@ -127,10 +153,15 @@ class GroupPostListView(generics.ListCreateAPIView):
 
     def list(self, request, group_id):
         queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
         serializer = self.get_serializer(queryset, many=True)
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
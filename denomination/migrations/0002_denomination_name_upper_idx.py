@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-16 04:36
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("denomination", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="denomination",
+            index=models.Index(
+                django.db.models.functions.text.Upper("name"),
+                name="denom_name_upper_idx",
+            ),
+        ),
+    ]
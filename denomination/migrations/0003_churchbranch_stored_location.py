@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-16 04:36
+
+from django.db import migrations, models
+
+
+def populate_location(apps, schema_editor):
+    ChurchBranch = apps.get_model('denomination', 'ChurchBranch')
+    for row in ChurchBranch.objects.only(
+        'id', 'address', 'city', 'state', 'country', 'latitude', 'longitude'
+    ).iterator():
+        row.full_address = f"{row.address}, {row.city}, {row.state}, {row.country}"
+        if row.latitude and row.longitude:
+            row.google_maps_url = f"https://www.google.com/maps?q={row.latitude},{row.longitude}"
+        row.save(update_fields=['full_address', 'google_maps_url'])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("denomination", "0002_denomination_name_upper_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="churchbranch",
+            name="full_address",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="full address"
+            ),
+        ),
+        migrations.AddField(
+            model_name="churchbranch",
+            name="google_maps_url",
+            field=models.URLField(
+                blank=True, editable=False, null=True, verbose_name="google maps url"
+            ),
+        ),
+        migrations.RunPython(populate_location, reverse_code=migrations.RunPython.noop),
+    ]
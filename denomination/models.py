@@ -4,11 +4,59 @@ Handles the organizational structure of churches
 """
 
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Upper
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
 from django.conf import settings
 
 
+def _count_for(queryset, fk):
+    """Correlated subquery counting rows of queryset whose fk is the outer row"""
+    counts = queryset.filter(**{fk: OuterRef('pk')}).order_by().values(fk).annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+# Fields that an empty slug is generated from
+SLUG_FIELDS = frozenset({'name', 'slug'})
+
+# Fields that full_address and google_maps_url are built from
+LOCATION_FIELDS = frozenset({'address', 'city', 'state', 'country', 'latitude', 'longitude'})
+
+
+def _writes_any(update_fields, fields):
+    """Check if a save with these update_fields writes any of fields (None writes all)"""
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+class DenominationQuerySet(models.QuerySet):
+    """QuerySet helpers for denominations"""
+    
+    def with_counts(self):
+        """Annotate total_branches and total_members (matches the properties)"""
+        from authentication.models import User
+        return self.annotate(
+            total_branches=_count_for(
+                ChurchBranch.objects.filter(status=ChurchBranch.Status.ACTIVE), 'denomination'
+            ),
+            total_members=_count_for(User.objects.filter(is_active=True), 'denomination'),
+        )
+
+
+class ChurchBranchQuerySet(models.QuerySet):
+    """QuerySet helpers for church branches"""
+    
+    def with_counts(self):
+        """Annotate total_members (matches the property)"""
+        from authentication.models import User
+        return self.annotate(
+            total_members=_count_for(User.objects.filter(is_active=True), 'church_branch'),
+        )
+
+
 class Denomination(models.Model):
     """
     Model representing a church denomination
@@ -78,30 +126,38 @@ class Denomination(models.Model):
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
     
+    objects = DenominationQuerySet.as_manager()
+    
     class Meta:
         db_table = 'denominations'
         verbose_name = _('denomination')
         verbose_name_plural = _('denominations')
         ordering = ['name']
+        indexes = [
+            # name__iexact compiles to UPPER(name) on PostgreSQL
+            models.Index(Upper('name'), name='denom_name_upper_idx'),
+        ]
     
     def __str__(self):
         return self.name
     
     def save(self, *args, **kwargs):
-        """Auto-generate slug from name"""
-        if not self.slug:
+        """Auto-generate slug from name when the save writes it"""
+        update_fields = kwargs.get('update_fields')
+        if not self.slug and _writes_any(update_fields, SLUG_FIELDS):
             self.slug = slugify(self.name)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'slug'}
         super().save(*args, **kwargs)
     
-    @property
+    @cached_property
     def total_branches(self):
-        """Get total number of branches"""
+        """Get total number of branches (overridden by the with_counts() annotation)"""
         return self.branches.filter(status=ChurchBranch.Status.ACTIVE).count()
     
-    @property
+    @cached_property
     def total_members(self):
-        """Get total members across all branches"""
-        from django.db.models import Count
+        """Get total members across all branches (overridden by the with_counts() annotation)"""
         return self.users.filter(is_active=True).count()
 
 
@@ -159,6 +215,10 @@ class ChurchBranch(models.Model):
         null=True
     )
     
+    # Derived from the fields above on save
+    full_address = models.TextField(_('full address'), blank=True, editable=False)
+    google_maps_url = models.URLField(_('google maps url'), blank=True, null=True, editable=False)
+    
     # Contact Information
     contact_email = models.EmailField(_('contact email'))
     contact_phone = models.CharField(_('contact phone'), max_length=20)
@@ -205,6 +265,8 @@ class ChurchBranch(models.Model):
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
     
+    objects = ChurchBranchQuerySet.as_manager()
+    
     class Meta:
         db_table = 'church_branches'
         verbose_name = _('church branch')
@@ -216,27 +278,27 @@ class ChurchBranch(models.Model):
         return f"{self.name} - {self.denomination.name}"
     
     def save(self, *args, **kwargs):
-        """Auto-generate slug from name"""
-        if not self.slug:
+        """Auto-generate slug from name and store the derived location fields when the save writes them"""
+        update_fields = kwargs.get('update_fields')
+        derived = set()
+        if not self.slug and _writes_any(update_fields, SLUG_FIELDS):
             self.slug = slugify(self.name)
+            derived.add('slug')
+        if _writes_any(update_fields, LOCATION_FIELDS):
+            self.full_address = f"{self.address}, {self.city}, {self.state}, {self.country}"
+            if self.latitude and self.longitude:
+                self.google_maps_url = f"https://www.google.com/maps?q={self.latitude},{self.longitude}"
+            else:
+                self.google_maps_url = None
+            derived.update(('full_address', 'google_maps_url'))
+        if update_fields is not None and derived:
+            kwargs['update_fields'] = {*update_fields, *derived}
         super().save(*args, **kwargs)
     
-    @property
-    def full_address(self):
-        """Get formatted full address"""
-        return f"{self.address}, {self.city}, {self.state}, {self.country}"
-    
-    @property
+    @cached_property
     def total_members(self):
-        """Get total members in this branch"""
+        """Get total members in this branch (overridden by the with_counts() annotation)"""
         return self.users.filter(is_active=True).count()
-    
-    @property
-    def google_maps_url(self):
-        """Generate Google Maps URL if coordinates exist"""
-        if self.latitude and self.longitude:
-            return f"https://www.google.com/maps?q={self.latitude},{self.longitude}"
-        return None
 
 
 class BranchDepartment(models.Model):
@@ -7,6 +7,15 @@ from .models import Denomination, ChurchBranch, BranchDepartment
 from  authentication.serializers import UserSerializer
 
 
+class DenominationMinimalSerializer(serializers.ModelSerializer):
+    """Serializer for embedding a denomination reference (no counts)"""
+    
+    class Meta:
+        model = Denomination
+        fields = ['id', 'name', 'slug', 'logo']
+        read_only_fields = fields
+
+
 class DenominationListSerializer(serializers.ModelSerializer):
     """Serializer for listing denominations (lightweight)"""
     
@@ -111,7 +120,7 @@ class ChurchBranchListSerializer(serializers.ModelSerializer):
 class ChurchBranchSerializer(serializers.ModelSerializer):
     """Full serializer for church branch details"""
     
-    denomination = DenominationListSerializer(read_only=True)
+    denomination = DenominationMinimalSerializer(read_only=True)
     denomination_id = serializers.IntegerField(write_only=True)
     admin_user_detail = UserSerializer(source='admin_user', read_only=True)
     departments = BranchDepartmentSerializer(many=True, read_only=True)
@@ -137,9 +146,7 @@ class ChurchBranchSerializer(serializers.ModelSerializer):
     
     def validate_denomination_id(self, value):
         """Validate denomination exists"""
-        try:
-            Denomination.objects.get(id=value)
-        except Denomination.DoesNotExist:
+        if not Denomination.objects.filter(pk=value).exists():
             raise serializers.ValidationError("Denomination does not exist.")
         return value
     
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Prefetch
 
 from .models import Denomination, ChurchBranch, BranchDepartment
 from .serializers import (
@@ -30,7 +31,9 @@ class DenominationListCreateView(generics.ListCreateAPIView):
     GET /api/denominations/
     POST /api/denominations/
     """
-    queryset = Denomination.objects.filter(status=Denomination.Status.ACTIVE)
+    queryset = Denomination.objects.filter(status=Denomination.Status.ACTIVE).with_counts().only(
+        'id', 'name', 'slug', 'logo', 'status', 'created_at'
+    )
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description', 'headquarters']
     ordering_fields = ['name', 'created_at', 'total_branches']
@@ -76,7 +79,7 @@ class DenominationListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         }, status=status.HTTP_200_OK)
 
@@ -88,7 +91,7 @@ class DenominationDetailView(generics.RetrieveUpdateDestroyAPIView):
     PUT/PATCH /api/denominations/<id>/
     DELETE /api/denominations/<id>/
     """
-    queryset = Denomination.objects.all()
+    queryset = Denomination.objects.with_counts()
     lookup_field = 'id'
     
     def get_serializer_class(self):
@@ -152,7 +155,15 @@ class ChurchBranchListCreateView(generics.ListCreateAPIView):
     GET /api/churches/
     POST /api/churches/
     """
-    queryset = ChurchBranch.objects.filter(status=ChurchBranch.Status.ACTIVE)
+    # The list rows render the denomination name and admin name, and no long text columns
+    list_fields = (
+        'id', 'name', 'slug', 'denomination', 'city', 'state', 'country',
+        'image', 'status', 'admin_user', 'created_at', 'denomination__name',
+        'admin_user__first_name', 'admin_user__last_name', 'admin_user__username'
+    )
+    queryset = ChurchBranch.objects.filter(
+        status=ChurchBranch.Status.ACTIVE
+    ).select_related('denomination', 'admin_user').with_counts().only(*list_fields)
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['denomination', 'city', 'state', 'country', 'status']
     search_fields = ['name', 'description', 'address', 'city']
@@ -182,7 +193,9 @@ class ChurchBranchListCreateView(generics.ListCreateAPIView):
         
         # Super admin sees everything
         if user.is_super_admin():
-            return ChurchBranch.objects.all()
+            return ChurchBranch.objects.select_related(
+                'denomination', 'admin_user'
+            ).with_counts().only(*self.list_fields)
         
         # Denomination admin sees their denomination's branches
         if user.is_denomination_admin() and user.denomination:
@@ -223,7 +236,7 @@ class ChurchBranchListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         }, status=status.HTTP_200_OK)
 
@@ -235,7 +248,12 @@ class ChurchBranchDetailView(generics.RetrieveUpdateDestroyAPIView):
     PUT/PATCH /api/churches/<id>/
     DELETE /api/churches/<id>/
     """
-    queryset = ChurchBranch.objects.all()
+    # Everything ChurchBranchSerializer nests, including department heads
+    queryset = ChurchBranch.objects.select_related(
+        'denomination', 'admin_user__profile'
+    ).with_counts().prefetch_related(
+        Prefetch('departments', queryset=BranchDepartment.objects.select_related('head__profile'))
+    )
     lookup_field = 'id'
     
     def get_serializer_class(self):
@@ -315,7 +333,7 @@ class ChurchBranchMembersView(generics.ListAPIView):
         
         return Response({
             'success': True,
-            'count': members.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         }, status=status.HTTP_200_OK)
 
@@ -376,7 +394,7 @@ class DepartmentListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         }, status=status.HTTP_200_OK)
 
@@ -14,7 +14,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-@shared_task(name='send_event_reminders')
+@shared_task(name='send_event_reminders', acks_late=True)
 def send_event_reminders():
     """
     Send reminders for upcoming events
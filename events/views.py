@@ -84,7 +84,7 @@ class EventCategoryListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -242,7 +242,7 @@ class EventListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -369,7 +369,7 @@ class RSVPListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -523,7 +523,7 @@ class EventAttendanceListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -72,7 +72,7 @@ class MediaCategoryListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -157,7 +157,7 @@ class MediaTagListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -257,7 +257,7 @@ class MediaItemListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -419,7 +419,7 @@ class MediaPlaylistListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -540,7 +540,7 @@ class MediaFavoriteListView(generics.ListAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -617,7 +617,7 @@ class MediaCommentListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -197,7 +197,7 @@ class MemberListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -325,7 +325,7 @@ class AttendanceListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -462,7 +462,7 @@ class MemberNoteListCreateView(generics.ListCreateAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 
@@ -535,7 +535,7 @@ class MemberDepartmentListView(generics.ListAPIView):
         
         return Response({
             'success': True,
-            'count': queryset.count(),
+            'count': len(serializer.data),
             'data': serializer.data
         })
 